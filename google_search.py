@@ -1,8 +1,24 @@
 # google_search.py
 from fastmcp import FastMCP
 import sys
+import os
+import json
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import sqlite3
 import logging
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional
 from ddgs import DDGS
+from ddgs.exceptions import DDGSException, RatelimitException, TimeoutException
 
 # Configure logging with detailed format
 logging.basicConfig(
@@ -24,7 +40,690 @@ logger.info('='*60)
 # Create an MCP server
 mcp = FastMCP("GoogleSearch")
 
-def perform_web_search(query: str, num_results: int = 5, region: str = 'vn-vi'):
+# Result cache: voice clients repeat the same questions, so results are kept in
+# memory (LRU) and in SQLite (survives restarts) for SEARCH_CACHE_TTL seconds.
+# Set SEARCH_CACHE_PATH='' to keep the cache in memory only.
+_SEARCH_CACHE_PATH = os.getenv('SEARCH_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search_cache.db'))
+_SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 3600))
+_SEARCH_CACHE_MEMORY_ENTRIES = 256
+_SEARCH_CACHE_DISK_ROWS = 5000
+
+def normalize_query(query: str) -> str:
+    """Cache form of a query: Unicode NFC, case-folded, single spaces"""
+    return ' '.join(unicodedata.normalize('NFC', query).casefold().split())
+
+class SearchResultCache:
+    """
+    Two-tier search result cache: an in-memory LRU in front of a SQLite table
+    
+    Entries are keyed by (normalized query, region) and remember how many results
+    were requested, so a request for fewer results is answered from a larger
+    cached set. A set shorter than what was requested holds every result there
+    is and answers any request size.
+    """
+    
+    def __init__(self, path: Optional[str], ttl: float = 3600, max_entries: int = 256, max_rows: int = 5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        # (query, region) -> (results, num_requested, created_at)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+        self._conn = None
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                with self._conn:
+                    self._conn.execute("PRAGMA journal_mode=WAL")
+                    self._conn.execute("""
+                        CREATE TABLE IF NOT EXISTS search_cache (
+                            query TEXT NOT NULL,
+                            region TEXT NOT NULL,
+                            num_requested INTEGER NOT NULL,
+                            results TEXT NOT NULL,
+                            created_at REAL NOT NULL,
+                            PRIMARY KEY (query, region)
+                        )
+                    """)
+                    self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_created ON search_cache(created_at)")
+                logger.info(f"💽 Search cache database: {path}")
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Cannot open search cache {path}: {e} - caching in memory only")
+                self._conn = None
+    
+    @staticmethod
+    def _covers(results: List[Dict], num_requested: int, num_results: int) -> bool:
+        return num_requested >= num_results or len(results) < num_requested
+    
+    def get(self, query: str, region: str, num_results: int) -> Optional[List[Dict]]:
+        """Cached results for a request (at most num_results), or None"""
+        key = (normalize_query(query), region)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[2] + self.ttl <= now:
+                del self._memory[key]
+                entry = None
+            if entry is not None and self._covers(entry[0], entry[1], num_results):
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return entry[0][:num_results]
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT results, num_requested, created_at FROM search_cache WHERE query = ? AND region = ?",
+                    key).fetchone()
+                if row is not None and row[2] + self.ttl > now:
+                    results = json.loads(row[0])
+                    if self._covers(results, row[1], num_results):
+                        self._remember(key, (results, row[1], row[2]))
+                        self._counters['disk_hits'] += 1
+                        return results[:num_results]
+            self._counters['misses'] += 1
+            return None
+    
+    def put(self, query: str, region: str, num_results: int, results: List[Dict]):
+        """Store the results of a request, unless a larger set is already cached"""
+        if not results:
+            # Empty answers are usually rate limiting, not "nothing found"
+            return
+        key = (normalize_query(query), region)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[2] + self.ttl > now and entry[1] > num_results:
+                return
+            self._remember(key, (results, num_results, now))
+            self._counters['stores'] += 1
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO search_cache (query, region, num_requested, results, created_at) "
+                        "VALUES (?, ?, ?, ?, ?) ON CONFLICT(query, region) DO UPDATE SET "
+                        "num_requested = excluded.num_requested, results = excluded.results, "
+                        "created_at = excluded.created_at "
+                        "WHERE excluded.num_requested >= search_cache.num_requested "
+                        "OR search_cache.created_at <= ?",
+                        (*key, num_results, json.dumps(results, ensure_ascii=False), now, now - self.ttl))
+                    if self._counters['stores'] % 100 == 0:
+                        self._prune()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Search cache write failed: {e}")
+    
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _prune(self):
+        """Drop expired rows and the oldest rows beyond max_rows (caller holds the lock)"""
+        self._conn.execute("DELETE FROM search_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM search_cache WHERE rowid IN "
+            "(SELECT rowid FROM search_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,))
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and current usage"""
+        with self._lock:
+            hits = self._counters['memory_hits'] + self._counters['disk_hits']
+            lookups = hits + self._counters['misses']
+            disk_rows = None
+            if self._conn is not None:
+                disk_rows = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+            return dict(
+                self._counters,
+                memory_entries=len(self._memory),
+                disk_rows=disk_rows,
+                hit_ratio=round(hits / lookups, 3) if lookups else None,
+            )
+
+_search_cache = SearchResultCache(_SEARCH_CACHE_PATH, _SEARCH_CACHE_TTL,
+                                  _SEARCH_CACHE_MEMORY_ENTRIES, _SEARCH_CACHE_DISK_ROWS)
+
+# DDGS clients are reused: each one keeps its search engines and their HTTP
+# sessions (connection pools, cookies), which a fresh DDGS() has to rebuild.
+# A client is checked out by one search at a time and replaced after a transport
+# or throttling error (a search without hits keeps it).
+_SEARCH_CLIENT_POOL_SIZE = int(os.getenv('SEARCH_CLIENT_POOL_SIZE', 4))
+_SEARCH_TIMEOUT = 5  # Seconds, per search engine request
+
+class DDGSClientPool:
+    """
+    Pool of long-lived DDGS clients
+    
+    Clients are handed out exclusively (a DDGS object is not safe to share
+    between threads) and the most recently used idle client is handed out first,
+    so its connections are still open. A client whose search failed on the
+    transport or was throttled is dropped and a new one is built on the next
+    checkout; one that only found nothing goes back to the pool.
+    """
+    
+    def __init__(self, size: int = 4, timeout: int = 5):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle = []  # Stack of idle clients
+        self._created = 0  # Live clients (idle + checked out)
+        self._cond = threading.Condition()
+        self._counters = {'created': 0, 'reused': 0, 'discarded': 0, 'kept_after_error': 0, 'waits': 0}
+    
+    def _new_client(self) -> DDGS:
+        client = DDGS(timeout=self.timeout)
+        try:
+            # Build the text engines (and their HTTP clients) now instead of on first search.
+            # _get_engines is private ddgs API (checked against ddgs 9.16); if it goes
+            # away the engines are simply built on the first search
+            client._get_engines('text', 'auto')
+        except Exception as e:
+            logger.warning(f"⚠️  Could not pre-build search engines: {e}")
+        return client
+    
+    def warm(self):
+        """Create the pool's clients up front (called at service startup)"""
+        started = time.perf_counter()
+        with self._cond:
+            missing = self.size - self._created
+            self._created += missing
+        clients = []
+        try:
+            for _ in range(missing):
+                clients.append(self._new_client())
+        finally:
+            with self._cond:
+                self._created -= missing - len(clients)
+                self._idle.extend(clients)
+                self._counters['created'] += len(clients)
+                self._cond.notify_all()
+        logger.info(f"🔥 Warmed {len(clients)} search clients in {(time.perf_counter() - started) * 1000:.0f} ms")
+    
+    @contextmanager
+    def client(self):
+        """Check out a client for one search; it is returned, or dropped if the search hit a client fault"""
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                self._counters['waits'] += 1
+                self._cond.wait()
+            if self._idle:
+                client = self._idle.pop()
+                self._counters['reused'] += 1
+            else:
+                client = None
+                self._created += 1
+        if client is None:
+            try:
+                client = self._new_client()
+            except BaseException:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._counters['created'] += 1
+        try:
+            yield client
+        except BaseException as e:
+            with self._cond:
+                if _discards_client(e):
+                    self._created -= 1
+                    self._counters['discarded'] += 1
+                else:
+                    self._idle.append(client)
+                    self._counters['kept_after_error'] += 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._idle.append(client)
+            self._cond.notify()
+    
+    def stats(self) -> Dict:
+        with self._cond:
+            return dict(self._counters, size=self.size, live=self._created, idle=len(self._idle))
+
+_ddgs_pool = DDGSClientPool(_SEARCH_CLIENT_POOL_SIZE, _SEARCH_TIMEOUT)
+
+# Request scheduling: DuckDuckGo throttles bursts, so every search first takes a
+# token from a shared bucket (SEARCH_RATE_PER_MINUTE, bursts of SEARCH_BURST).
+# Waiting searches are served by priority, then arrival. When a search looks
+# throttled the whole bucket pauses for a decorrelated-jitter backoff, and the
+# search is retried, unless the wait would exceed the caller's time budget.
+_SEARCH_RATE_PER_MINUTE = float(os.getenv('SEARCH_RATE_PER_MINUTE', 20))
+_SEARCH_BURST = int(os.getenv('SEARCH_BURST', 4))
+_SEARCH_BUDGET = 10.0       # Seconds a search may spend waiting for a slot and retrying
+_BACKOFF_BASE = 1.0         # Seconds, first pause after being throttled
+_BACKOFF_CAP = 30.0         # Seconds, longest pause
+_MAX_SEARCH_ATTEMPTS = 3
+PRIORITY_INTERACTIVE = 0    # A user is waiting on this search
+PRIORITY_BATCH = 1          # One of several searches for the same turn
+
+class SearchBudgetExceeded(Exception):
+    """The expected wait for a search slot is longer than the caller's time budget"""
+
+class SearchScheduler:
+    """
+    Token bucket with a priority queue of waiting searches
+    
+    acquire() blocks until the caller's turn comes and a token is available, or
+    raises SearchBudgetExceeded as soon as the expected wait passes the caller's
+    deadline. record_throttle() pauses the bucket for a backoff that grows with
+    decorrelated jitter (sleep = min(cap, uniform(base, sleep * 3))) and
+    record_success() resets it.
+    """
+    
+    def __init__(self, rate_per_minute: float = 20, burst: int = 4,
+                 backoff_base: float = 1.0, backoff_cap: float = 30.0):
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._tokens = float(self.burst)
+        # Tokens accrue from this time on; set into the future to pause the bucket
+        self._updated = time.monotonic()
+        self._backoff = backoff_base
+        self._waiting = []  # Heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._counters = {'granted': 0, 'rejected': 0, 'throttled': 0, 'waited_seconds': 0.0}
+    
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+    
+    def _expected_wait(self, ahead: int, now: float) -> float:
+        """Seconds until a token is free for a request with `ahead` requests queued before it"""
+        deficit = ahead + 1 - self._tokens
+        return max(0.0, self._updated - now) + (deficit / self.rate if deficit > 0 else 0.0)
+    
+    def acquire(self, priority: int, deadline: float) -> float:
+        """
+        Wait for a search slot
+        
+        Args:
+            priority: Lower is served first (PRIORITY_INTERACTIVE, PRIORITY_BATCH)
+            deadline: time.monotonic() by which the search must have started
+        
+        Returns:
+            Seconds spent waiting
+        """
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiting, entry)
+            started = time.monotonic()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    ahead = sum(1 for other in self._waiting if other < entry)
+                    wait = self._expected_wait(ahead, now)
+                    if now + wait > deadline:
+                        self._counters['rejected'] += 1
+                        raise SearchBudgetExceeded(
+                            f"Search rate limit: expected wait {wait:.1f}s exceeds the remaining "
+                            f"budget of {max(0.0, deadline - now):.1f}s")
+                    if ahead == 0 and wait <= 0:
+                        self._tokens -= 1
+                        self._counters['granted'] += 1
+                        self._counters['waited_seconds'] += now - started
+                        return now - started
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+    
+    def record_throttle(self) -> float:
+        """Pause the bucket after a throttled search; returns the pause in seconds"""
+        with self._cond:
+            self._backoff = min(self.backoff_cap, random.uniform(self.backoff_base, self._backoff * 3))
+            now = time.monotonic()
+            self._refill(now)
+            self._updated = max(self._updated, now + self._backoff)
+            # One probe goes out when the pause ends, the rest follow at the normal rate
+            self._tokens = min(self._tokens, 1.0)
+            self._counters['throttled'] += 1
+            self._cond.notify_all()
+            return self._backoff
+    
+    def try_acquire(self) -> bool:
+        """Take a token only if one is free now and no search is queued (for optional requests)"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if self._waiting or now < self._updated or self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self._counters['granted'] += 1
+            return True
+    
+    def record_success(self):
+        with self._cond:
+            self._backoff = self.backoff_base
+    
+    def stats(self) -> Dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            return dict(
+                self._counters,
+                waited_seconds=round(self._counters['waited_seconds'], 2),
+                waiting=len(self._waiting),
+                tokens=round(self._tokens, 2),
+                paused_seconds=round(max(0.0, self._updated - time.monotonic()), 2),
+            )
+
+_search_scheduler = SearchScheduler(_SEARCH_RATE_PER_MINUTE, _SEARCH_BURST, _BACKOFF_BASE, _BACKOFF_CAP)
+
+def _looks_throttled(error: Exception) -> bool:
+    """Whether a search error is DuckDuckGo throttling us (RatelimitException or HTTP 429)"""
+    if isinstance(error, RatelimitException):
+        return True
+    message = str(error).lower()
+    return '429' in message or 'too many requests' in message
+
+def _is_no_results(error: Exception) -> bool:
+    """ddgs reports a search without hits as an error"""
+    return 'no results found' in str(error).lower()
+
+def _discards_client(error: BaseException) -> bool:
+    """
+    Whether a failed search should retire its DDGS client
+    
+    ddgs wraps transport errors in DDGSException (or TimeoutException), and
+    throttling may leave a session's cookies flagged. A search without hits,
+    or an error outside ddgs, says nothing about the client.
+    """
+    if not isinstance(error, Exception):
+        # Interrupted mid-request: the client's state is unknown
+        return True
+    if isinstance(error, (TimeoutException, RatelimitException)) or _looks_throttled(error):
+        return True
+    return isinstance(error, DDGSException) and not _is_no_results(error)
+
+# Search backends: a search can be sent to several backends. The first one is
+# asked right away; if it has not answered within its p95 latency, the next one
+# is asked as well (a hedged request) and the first non-empty answer wins. A
+# backend that fails hands over to the next one immediately. SEARCH_BACKENDS
+# lists them in order: ddgs engine selections ("auto", "duckduckgo", "brave",
+# ...) or "local" for the offline stub.
+_SEARCH_BACKENDS = os.getenv('SEARCH_BACKENDS', 'auto,duckduckgo')
+_LATENCY_SAMPLES = 200      # Recent durations kept per backend for p50/p95
+_HEDGE_MIN_SAMPLES = 20     # Until a backend has this many, _HEDGE_DEFAULT_DELAY is used
+_HEDGE_DEFAULT_DELAY = 2.0  # Seconds
+_HEDGE_MIN_DELAY = 0.3      # Seconds; never hedge sooner than this
+
+class SearchBackend(ABC):
+    """A source of raw text results (dicts with title, href and body)"""
+    
+    name = 'backend'
+    rate_limited = True  # Requests count against the shared search scheduler
+    
+    @abstractmethod
+    def search(self, query: str, region: str, max_results: int) -> List[Dict]:
+        """Up to max_results raw results; raises on failure"""
+
+class DDGSBackend(SearchBackend):
+    """DuckDuckGo metasearch through a pooled DDGS client, on one ddgs engine selection"""
+    
+    def __init__(self, engine: str = 'auto'):
+        self.engine = engine
+        self.name = f'ddgs:{engine}'
+    
+    def search(self, query: str, region: str, max_results: int) -> List[Dict]:
+        with _ddgs_pool.client() as ddgs:
+            return list(ddgs.text(query, region=region, max_results=max_results, backend=self.engine))
+
+class LocalBackend(SearchBackend):
+    """
+    Offline stub backend with simulated latency and failures
+    
+    Returns made-up results after `latency` seconds, or `slow_latency` seconds
+    for a `slow_rate` fraction of calls, and raises for an `error_rate` fraction.
+    Used to test and benchmark hedging and timeouts without network access.
+    """
+    
+    rate_limited = False
+    
+    def __init__(self, name: str = 'local', latency: float = 0.05, slow_latency: Optional[float] = None,
+                 slow_rate: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.name = name
+        self.latency = latency
+        self.slow_latency = slow_latency if slow_latency is not None else latency
+        self.slow_rate = slow_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+    
+    def search(self, query: str, region: str, max_results: int) -> List[Dict]:
+        time.sleep(self.slow_latency if self._random.random() < self.slow_rate else self.latency)
+        if self._random.random() < self.error_rate:
+            raise DDGSException(f"{self.name}: simulated failure")
+        return [{
+            "title": f"{query} - {self.name} result {idx}",
+            "href": f"https://{self.name}.invalid/{region}/{idx}",
+            "body": f"Offline result {idx} for '{query}'",
+        } for idx in range(1, max_results + 1)]
+
+class BackendStats:
+    """Latency and outcome counters for one backend"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=_LATENCY_SAMPLES)  # Seconds, completed calls
+        self._counters = {'requests': 0, 'errors': 0, 'empty': 0, 'wins': 0, 'hedges': 0}
+    
+    def record(self, seconds: float, outcome: str):
+        """outcome: 'ok', 'empty' or 'error'"""
+        with self._lock:
+            self._counters['requests'] += 1
+            if outcome == 'error':
+                self._counters['errors'] += 1
+            else:
+                self._latencies.append(seconds)
+                if outcome == 'empty':
+                    self._counters['empty'] += 1
+    
+    def count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+    
+    def percentile(self, fraction: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile in seconds, or None with fewer than min_samples samples"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            samples = len(self._latencies)
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return dict(
+            counters,
+            error_rate=round(counters['errors'] / counters['requests'], 3) if counters['requests'] else None,
+            samples=samples,
+            p50_ms=round(p50 * 1000, 1) if p50 is not None else None,
+            p95_ms=round(p95 * 1000, 1) if p95 is not None else None,
+        )
+
+class HedgedSearch:
+    """
+    Sends a search to an ordered list of backends with hedging
+    
+    Backends after the first are only asked when the current ones are slow (past
+    the last started backend's p95 latency) or have failed. Calls run in worker
+    threads; a losing call is left to finish in the background, so its latency
+    still counts toward its backend's stats.
+    """
+    
+    def __init__(self, backends: List[SearchBackend], max_workers: int = 16):
+        self.backends = backends
+        self._stats = {backend.name: BackendStats() for backend in backends}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='search-backend')
+    
+    def hedge_delay(self, backend: SearchBackend) -> float:
+        """Seconds to wait for a backend before asking the next one"""
+        p95 = self._stats[backend.name].percentile(0.95, _HEDGE_MIN_SAMPLES)
+        if p95 is None:
+            return _HEDGE_DEFAULT_DELAY
+        return max(_HEDGE_MIN_DELAY, p95)
+    
+    def _call(self, backend: SearchBackend, query: str, region: str, max_results: int) -> List[Dict]:
+        stats = self._stats[backend.name]
+        started = time.perf_counter()
+        try:
+            results = backend.search(query, region, max_results)
+        except Exception:
+            stats.record(time.perf_counter() - started, 'error')
+            raise
+        stats.record(time.perf_counter() - started, 'ok' if results else 'empty')
+        return results
+    
+    def search(self, query: str, region: str, max_results: int, timeout: float):
+        """
+        First non-empty answer from the backends
+        
+        The first backend's request must already be admitted by the scheduler;
+        later rate-limited backends are only asked if a token is free right away.
+        
+        Returns:
+            (results, backend name); results are empty if every backend answered empty
+        
+        Raises:
+            The last backend error if no backend answered, TimeoutException if
+            nothing answered within timeout
+        """
+        deadline = time.monotonic() + timeout
+        waiting = list(self.backends)
+        pending = {}  # Future -> backend
+        last_error = None
+        empty_from = None
+        hedge_at = None
+        
+        def launch(hedge: bool) -> bool:
+            nonlocal hedge_at
+            backend = waiting.pop(0)
+            if hedge and backend.rate_limited and not _search_scheduler.try_acquire():
+                logger.info(f"🚦 No search slot free - not asking {backend.name}")
+                return False
+            if pending:
+                self._stats[backend.name].count('hedges')
+                logger.info(f"🪃 Also asking {backend.name} (hedged request)")
+            elif hedge:
+                logger.info(f"↪️  Falling back to {backend.name}")
+            pending[self._executor.submit(self._call, backend, query, region, max_results)] = backend
+            hedge_at = time.monotonic() + self.hedge_delay(backend)
+            return True
+        
+        launch(hedge=False)
+        while pending or waiting:
+            now = time.monotonic()
+            if now >= deadline:
+                raise TimeoutException(f"No search backend answered within {timeout:.1f}s")
+            if waiting and (not pending or now >= hedge_at):
+                launch(hedge=True)
+                continue
+            wait_for = deadline - now
+            if waiting:
+                wait_for = min(wait_for, hedge_at - now)
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️  Search backend {backend.name} failed: {e}")
+                    last_error = e
+                    continue
+                if results:
+                    self._stats[backend.name].count('wins')
+                    return results, backend.name
+                empty_from = backend.name
+        if empty_from is not None or last_error is None:
+            return [], empty_from
+        raise last_error
+    
+    def stats(self) -> Dict:
+        return {name: stats.stats() for name, stats in self._stats.items()}
+    
+    def latency(self, backend_name: str) -> Dict:
+        stats = self._stats[backend_name].stats()
+        return {'samples': stats['samples'], 'p50_ms': stats['p50_ms'], 'p95_ms': stats['p95_ms']}
+
+def _build_backends(spec: str) -> List[SearchBackend]:
+    """Backends from a comma-separated SEARCH_BACKENDS value"""
+    try:
+        from ddgs.engines import ENGINES
+        known_engines = set(ENGINES['text']) | {'auto'}
+    except (ImportError, KeyError):
+        known_engines = None
+    backends = []
+    for name in (part.strip() for part in spec.split(',')):
+        if not name:
+            continue
+        if name == 'local':
+            backends.append(LocalBackend())
+        elif known_engines is None or name in known_engines:
+            backends.append(DDGSBackend(name))
+        else:
+            logger.warning(f"⚠️  Unknown search backend '{name}' ignored")
+    if not backends:
+        backends.append(DDGSBackend('auto'))
+    logger.info(f"🔌 Search backends: {', '.join(backend.name for backend in backends)}")
+    return backends
+
+_search_backends = HedgedSearch(_build_backends(_SEARCH_BACKENDS))
+
+def warm_search_clients():
+    """Pre-create the DDGS clients so the first searches skip client setup"""
+    _ddgs_pool.warm()
+
+def get_search_stats() -> Dict:
+    """Runtime counters for the search service (served by the hub at /stats)"""
+    return {
+        'result_cache': _search_cache.stats(),
+        'clients': _ddgs_pool.stats(),
+        'scheduler': _search_scheduler.stats(),
+        'backends': _search_backends.stats(),
+    }
+
+def _scheduled_text_search(query: str, num_results: int, region: str, priority: int, budget: float) -> List[Dict]:
+    """Raw text results from the search backends, through the request scheduler, retrying when throttled"""
+    deadline = time.monotonic() + budget
+    for attempt in range(1, _MAX_SEARCH_ATTEMPTS + 1):
+        if _search_backends.backends[0].rate_limited:
+            waited = _search_scheduler.acquire(priority, deadline)
+            if waited >= 0.1:
+                logger.info(f"🚦 Waited {waited:.1f}s for a search slot")
+        
+        logger.info(f"🔍 Executing search query: '{query}' (attempt {attempt})")
+        started = time.perf_counter()
+        try:
+            results, backend_name = _search_backends.search(
+                query, region, num_results, max(0.1, deadline - time.monotonic()))
+        except DDGSException as e:
+            if _is_no_results(e):
+                # Nothing to find is an answer, not a reason to retry or slow others down
+                return []
+            if not _looks_throttled(e) or attempt == _MAX_SEARCH_ATTEMPTS:
+                raise
+            backoff = _search_scheduler.record_throttle()
+            logger.warning(f"🚦 Search looks rate limited ({e}) - pausing searches for {backoff:.1f}s")
+            continue
+        
+        elapsed = time.perf_counter() - started
+        if backend_name is not None:
+            latency = _search_backends.latency(backend_name)
+            logger.info(f"⏱️  Search took {elapsed * 1000:.0f} ms via {backend_name} (backend p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms over last {latency['samples']})")
+        
+        _search_scheduler.record_success()
+        return results
+    return []
+
+def perform_web_search(query: str, num_results: int = 5, region: str = 'vn-vi',
+                       priority: int = PRIORITY_INTERACTIVE, budget: float = _SEARCH_BUDGET):
     """
     Perform web search using DuckDuckGo (reliable and fast)
     
@@ -32,18 +731,15 @@ def perform_web_search(query: str, num_results: int = 5, region: str = 'vn-vi'):
         query: Search query
         num_results: Number of results to return
         region: Region code (e.g., 'vn-vi' for Vietnam, 'us-en' for US)
+        priority: Scheduling priority (PRIORITY_INTERACTIVE or PRIORITY_BATCH)
+        budget: Seconds the search may wait for rate limits before giving up
     """
     try:
         logger.info(f"🔎 Initiating DuckDuckGo search...")
         logger.info(f"🌍 Region: {region}")
         search_results = []
         
-        # Use DuckDuckGo Search with new API
-        logger.info(f"📡 Connecting to search API...")
-        ddgs = DDGS()
-        
-        logger.info(f"🔍 Executing search query: '{query}'")
-        results = list(ddgs.text(query, region=region, max_results=num_results))
+        results = _scheduled_text_search(query, num_results, region, priority, budget)
         
         logger.info(f"📊 Raw API returned {len(results)} results")
         
@@ -79,34 +775,9 @@ def perform_web_search(query: str, num_results: int = 5, region: str = 'vn-vi'):
         logger.error(f"Stack trace: {traceback.format_exc()}")
         raise
 
-@mcp.tool()
-def search_google(query: str, num_results: int = 5, lang: str = "vi") -> dict:
-    """
-    Search the web and return top results. Uses DuckDuckGo for reliability.
-    
-    Args:
-        query: Search query string (in any language)
-        num_results: Number of results to return (default: 5, max: 10)
-        lang: Language/region code (vi=Vietnam, en=US, ja=Japan, ko=Korea, etc.)
-    
-    Returns:
-        dict with success status and list of search results (title, URL, snippet)
-    
-    Example response:
-        {
-            "success": true,
-            "query": "Python programming",
-            "total_results": 5,
-            "results": [
-                {
-                    "rank": 1,
-                    "title": "Python.org",
-                    "url": "https://www.python.org/",
-                    "snippet": "Official Python website..."
-                }
-            ]
-        }
-    """
+def _search_google_sync(query: str, num_results: int = 5, lang: str = "vi",
+                        priority: int = PRIORITY_INTERACTIVE, budget: float = _SEARCH_BUDGET) -> dict:
+    """Blocking implementation of search_google (also used for each query of search_batch)"""
     try:
         logger.info('='*60)
         logger.info(f"🔍 NEW SEARCH REQUEST RECEIVED")
@@ -136,9 +807,15 @@ def search_google(query: str, num_results: int = 5, lang: str = "vi") -> dict:
         
         logger.info(f"⏳ Starting web search...")
         
-        # Perform web search with region
-        search_results = perform_web_search(query, num_results, region)
-            
+        # Repeated questions are answered from the cache
+        search_results = _search_cache.get(query, region, num_results)
+        cached = search_results is not None
+        if cached:
+            logger.info(f"💾 Cache hit - returning {len(search_results)} cached results")
+        else:
+            search_results = perform_web_search(query, num_results, region, priority, budget)
+            _search_cache.put(query, region, num_results, search_results)
+        
         logger.info(f"✅ Search completed successfully!")
         logger.info(f"Found {len(search_results)} results for query: '{query}'")
         
@@ -152,6 +829,7 @@ def search_google(query: str, num_results: int = 5, lang: str = "vi") -> dict:
             "success": True,
             "query": query,
             "total_results": len(search_results),
+            "cached": cached,
             "results": search_results
         }
         
@@ -169,12 +847,152 @@ def search_google(query: str, num_results: int = 5, lang: str = "vi") -> dict:
             "results": []
         }
 
+# search_batch limits
+_BATCH_MAX_QUERIES = 10
+_BATCH_MAX_CONCURRENCY = 8
+
+# Searches can block for their whole budget on rate-limit waits, so they run on
+# their own bounded pool rather than asyncio's default executor, which the news
+# tools share: a throttled batch then queues behind itself, not in front of news
+# calls. A full batch still leaves workers for interactive searches.
+_SEARCH_WORKERS = _BATCH_MAX_CONCURRENCY + 2
+_search_executor = ThreadPoolExecutor(max_workers=_SEARCH_WORKERS, thread_name_prefix='search')
+
+async def _run_search(query: str, num_results: int, lang: str,
+                      priority: int = PRIORITY_INTERACTIVE, budget: float = _SEARCH_BUDGET) -> dict:
+    """Run _search_google_sync on the search pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_search_executor, _search_google_sync, query, num_results, lang, priority, budget)
+
+@mcp.tool()
+async def search_google(query: str, num_results: int = 5, lang: str = "vi") -> dict:
+    """
+    Search the web and return top results. Uses DuckDuckGo for reliability.
+    
+    Args:
+        query: Search query string (in any language)
+        num_results: Number of results to return (default: 5, max: 10)
+        lang: Language/region code (vi=Vietnam, en=US, ja=Japan, ko=Korea, etc.)
+    
+    Returns:
+        dict with success status and list of search results (title, URL, snippet)
+    
+    Example response:
+        {
+            "success": true,
+            "query": "Python programming",
+            "total_results": 5,
+            "results": [
+                {
+                    "rank": 1,
+                    "title": "Python.org",
+                    "url": "https://www.python.org/",
+                    "snippet": "Official Python website..."
+                }
+            ]
+        }
+    """
+    # Rate-limit waits and retries block, so they run off the event loop
+    return await _run_search(query, num_results, lang)
+
+@mcp.tool()
+async def search_batch(
+    queries: List[str],
+    num_results: int = 3,
+    lang: str = "vi",
+    max_concurrency: int = _SEARCH_CLIENT_POOL_SIZE
+) -> dict:
+    """
+    Run several web searches at once and return all results together.
+    Use this instead of calling search_google repeatedly when one question
+    needs multiple lookups - the searches run in parallel.
+    
+    Args:
+        queries: List of search queries (max: 10; duplicates are searched once)
+        num_results: Number of results per query (default: 3, max: 10)
+        lang: Language/region code, as in search_google (default: "vi")
+        max_concurrency: How many searches run at the same time (default: the
+                         search client pool size, 4; max: 8)
+    
+    Searches share the service's rate limit (by default 20 per minute, bursts
+    of 4), so a batch of 10 new queries takes about 20 seconds; queries that
+    are already cached return at once.
+    
+    Returns:
+        dict with one entry per query, in the order given, each shaped like a
+        search_google response plus "elapsed_ms" (that query's own time)
+    
+    Example response:
+        {
+            "success": true,
+            "total_queries": 2,
+            "elapsed_ms": 1480,
+            "searches": [
+                {"query": "giá vàng", "success": true, "total_results": 3,
+                 "cached": false, "elapsed_ms": 1402, "results": [...]},
+                {"query": "thời tiết Hà Nội", "success": true, "total_results": 3,
+                 "cached": true, "elapsed_ms": 2, "results": [...]}
+            ]
+        }
+    """
+    logger.info('='*60)
+    logger.info(f"🔍 NEW BATCH SEARCH REQUEST: {len(queries)} queries")
+    
+    if len(queries) > _BATCH_MAX_QUERIES:
+        logger.warning(f"Batch truncated from {len(queries)} to {_BATCH_MAX_QUERIES} queries")
+        queries = queries[:_BATCH_MAX_QUERIES]
+    max_concurrency = min(max(1, max_concurrency), _BATCH_MAX_CONCURRENCY)
+    logger.info(f"Concurrency: {max_concurrency}")
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run(query: str) -> dict:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await _run_search(query, num_results, lang, PRIORITY_BATCH, budget)
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+            return result
+    
+    # Same question asked twice in one batch is searched once
+    unique = {}
+    for query in queries:
+        if query.strip():
+            unique.setdefault(normalize_query(query), query)
+    
+    # Each query may wait for the whole batch to pass the rate limit
+    budget = _SEARCH_BUDGET + len(unique) / _search_scheduler.rate
+    
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(run(query) for query in unique.values()))
+    by_key = dict(zip(unique, outcomes))
+    elapsed_ms = round((time.perf_counter() - started) * 1000)
+    
+    searches = []
+    for query in queries:
+        if not query.strip():
+            searches.append({"query": query, "success": False, "error": "Empty query", "results": [], "elapsed_ms": 0})
+        else:
+            searches.append(dict(by_key[normalize_query(query)], query=query))
+    
+    succeeded = sum(1 for search in searches if search["success"])
+    serial_ms = sum(outcome["elapsed_ms"] for outcome in outcomes)
+    logger.info(f"✅ Batch completed: {succeeded}/{len(searches)} succeeded in {elapsed_ms} ms (sum of searches: {serial_ms} ms)")
+    logger.info('='*60)
+    
+    return {
+        "success": succeeded > 0,
+        "total_queries": len(searches),
+        "elapsed_ms": elapsed_ms,
+        "searches": searches
+    }
+
 # Start the server
 if __name__ == "__main__":
     logger.info("🚀 Starting MCP server with stdio transport...")
     logger.info("📡 Server is ready to receive requests from MCP clients")
-    logger.info("💡 Available tools: search_google")
+    logger.info("💡 Available tools: search_google, search_batch")
     logger.info("Waiting for requests...\n")
+    warm_search_clients()
     try:
         mcp.run(transport="stdio")
     except KeyboardInterrupt:
@@ -1,14 +1,34 @@
 # news_service.py
 from fastmcp import FastMCP
 import sys
+import asyncio
 import logging
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, NamedTuple, Tuple
 import feedparser
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse, parse_qsl, urlencode
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
+import xml.etree.ElementTree as ET
+import base64
+import binascii
+import bisect
 import hashlib
+import heapq
+import html
 import json
+import math
+import os
+import re
+import secrets
+import sqlite3
+import time
+import unicodedata
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # Configure logging with detailed format
 logging.basicConfig(
@@ -30,241 +50,2495 @@ logger.info('='*60)
 # Create an MCP server
 mcp = FastMCP("NewsService")
 
+class Article(NamedTuple):
+    """
+    Immutable article record, shared by the feed store, caches and the database
+    
+    Responses are built from it with article_view(), so nothing downstream can
+    modify a cached article.
+    """
+    title: str
+    url: str
+    source: str                      # Interned feed name
+    date: str                        # Publication date as written in the feed
+    excerpt: str
+    published_ts: Optional[float]    # Epoch seconds (None if the feed gave no date)
+    priority: int = 999              # Feed priority, lower is preferred
+    hot_score: int = 0               # Hotness from HOT_INDICATORS, computed at ingest
+    hot_keywords: Tuple[str, ...] = ()
+
+# Hot news indicators (higher score = hotter)
+# Matched as whole words: 'nổ' does not match inside 'nổi bật'
+HOT_INDICATORS = {
+    'khẩn cấp': 10, 'nóng': 8, 'đột phá': 7, 'chấn động': 7,
+    'nổi bật': 6, 'bất ngờ': 6, 'sốc': 7, 'lần đầu': 5,
+    'breaking': 10, 'urgent': 9, 'exclusive': 7,
+    'vừa xảy ra': 8, 'mới xảy ra': 8, 'tin nhanh': 6,
+    'đặc biệt': 5, 'quan trọng': 4, 'nghiêm trọng': 7,
+    'khẩn': 8, 'nhanh': 3, 'mới': 2, 'hot': 6,
+    'cháy': 9, 'nổ': 8, 'tai nạn': 6, 'thiệt hại': 5,
+    'bắt giữ': 6, 'khởi tố': 6, 'điều tra': 4,
+    'biểu tình': 7, 'đình công': 7, 'xung đột': 8,
+    'từ chức': 6, 'từ nhiệm': 6, 'bổ nhiệm': 4, 'qua đời': 5,
+    'tử vong': 6, 'tử nạn': 7, 'thiệt mạng': 7,
+    'tăng đột biến': 6, 'giảm mạnh': 6, 'kỷ lục': 7,
+    'nghiêm cấm': 5, 'cấm': 4, 'truy tố': 5,
+    'ùn tắc': 4, 'tê liệt': 5, 'gián đoạn': 4,
+    'đề xuất': 3, 'kiến nghị': 3, 'yêu cầu': 2,
+    'mạnh': 3, 'lớn': 2, 'nghiêm': 4,
+}
+
+def _normalize_for_matching(text: str) -> str:
+    """NFC, lowercase, single spaces - the form keywords and text are matched in"""
+    return ' '.join(unicodedata.normalize('NFC', text).lower().split())
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton: finds every keyword in a text in one pass
+    
+    Cost depends on the text length, not on the number of keywords. Matches
+    must start and end on a word boundary.
+    """
+    
+    def __init__(self, keywords):
+        # Trie as parallel lists: goto[state] = {char: state}, fail[state] = state,
+        # output[state] = keywords ending at state
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for keyword in keywords:
+            self._add(_normalize_for_matching(keyword), keyword)
+        self._build_failure_links()
+    
+    def _add(self, pattern: str, keyword: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((keyword, len(pattern)))
+    
+    def _build_failure_links(self):
+        # Breadth-first, so a state's failure target is always finished before it
+        # (depth-1 states keep failure 0)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find(self, text: str) -> set:
+        """Keywords that occur in text as whole words"""
+        text = _normalize_for_matching(text)
+        found = set()
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, length in output[state]:
+                start = end - length + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    found.add(keyword)
+        return found
+
+_hot_matcher = KeywordMatcher(HOT_INDICATORS)
+
+def _score_hotness(title: str, excerpt: str) -> Tuple[int, Tuple[str, ...]]:
+    """Hotness score of an article; title matches are worth double"""
+    in_title = _hot_matcher.find(title)
+    in_excerpt = _hot_matcher.find(excerpt) - in_title
+    score = sum(HOT_INDICATORS[k] * 2 for k in in_title) + sum(HOT_INDICATORS[k] for k in in_excerpt)
+    return score, tuple(sorted(in_title | in_excerpt))
+
+def make_article(title: str, url: str, source: str, date: str, excerpt: str,
+                 published_ts: Optional[float], priority: int = 999) -> Article:
+    """Build an Article, interning its source name and scoring its hotness once"""
+    hot_score, hot_keywords = _score_hotness(title, excerpt)
+    return Article(title, url, sys.intern(source), date, excerpt, published_ts, priority, hot_score, hot_keywords)
+
+# Fields a response item can carry, in output order
+ARTICLE_FIELDS = ("rank", "title", "url", "source", "date", "excerpt")
+# Items of compact responses carry only the title unless fields says otherwise
+COMPACT_FIELDS = ("title",)
+
+def article_view(article: Article, rank: int, fields: Optional[Tuple[str, ...]] = None,
+                 excerpt_chars: Optional[int] = None) -> Dict:
+    """
+    Response item for an article (a new dict referencing the record's fields)
+    
+    Args:
+        fields: Fields to include (default: all of ARTICLE_FIELDS)
+        excerpt_chars: Shorten the excerpt to about this many characters
+    """
+    if fields is None:
+        fields = ARTICLE_FIELDS
+    view = {}
+    for field in fields:
+        if field == "rank":
+            view["rank"] = rank
+        elif field == "excerpt":
+            view["excerpt"] = _shorten(article.excerpt, excerpt_chars)
+        else:
+            view[field] = getattr(article, field)
+    return view
+
+def _shorten(text: str, max_chars: Optional[int]) -> str:
+    """Cut text at a word boundary to at most max_chars characters (plus an ellipsis)"""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,.;:') + '…'
+
+def parse_fields(fields: Optional[str], compact: bool = False) -> Tuple[str, ...]:
+    """
+    Fields for response items from a comma-separated list ("title,url")
+    
+    Unknown names are ignored; without any known name the default applies
+    (COMPACT_FIELDS in compact mode, otherwise ARTICLE_FIELDS).
+    """
+    wanted = {name.strip().lower() for name in (fields or '').split(',') if name.strip()}
+    unknown = wanted.difference(ARTICLE_FIELDS)
+    if unknown:
+        logger.warning(f"Ignoring unknown fields: {', '.join(sorted(unknown))}")
+    selected = tuple(field for field in ARTICLE_FIELDS if field in wanted)
+    if selected:
+        return selected
+    return COMPACT_FIELDS if compact else ARTICLE_FIELDS
+
+def compact_response(articles: List[Dict], has_more: bool, next_cursor: Optional[str], stale: bool) -> Dict:
+    """Minimal tool response for constrained clients: articles plus what is needed to page"""
+    response = {"success": True, "articles": articles, "has_more": has_more}
+    if has_more:
+        response["next_cursor"] = next_cursor
+    if stale:
+        response["stale"] = True
+    return response
+
+def _approx_size(obj, depth: int = 0) -> int:
+    """Rough memory footprint of a cached value (containers are walked 3 levels deep)"""
+    size = sys.getsizeof(obj)
+    if depth >= 3:
+        return size
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k, depth + 1) + _approx_size(v, depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_size(item, depth + 1) for item in obj)
+    return size
+
+class BoundedTTLCache:
+    """
+    Thread-safe LRU cache with TTL expiry and limits on entry count and total size
+    
+    Expired entries are dropped on access; when a limit is exceeded the least
+    recently used entries are evicted. Hit/miss/eviction counters are kept for stats().
+    """
+    
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024, ttl: float = 60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Key -> (value, expires_at, size)
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+    
+    def get(self, key, default=None):
+        """Return the cached value (and mark it recently used), or default if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+    
+    def set(self, key, value, size: Optional[int] = None):
+        """Store a value, evicting least recently used entries to stay within limits"""
+        if size is None:
+            size = _approx_size(value)
+        if size > self.max_bytes:
+            # Never cache something that would flush the whole cache
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+                self._counters['evictions'] += 1
+    
+    def pop(self, key, default=None):
+        """Remove an entry and return its value"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+    
+    def stats(self) -> Dict:
+        """Counters and current usage"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return dict(
+                self._counters,
+                entries=len(self._data),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hit_ratio=round(self._counters['hits'] / lookups, 3) if lookups else None,
+            )
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution
+    
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for it and share its result (or its exception).
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        # Key -> dict with done event, result, error and waiters
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'executions': 0, 'coalesced': 0, 'max_waiters': 0}
+    
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once for all concurrent callers with this key"""
+        with self._lock:
+            self._counters['calls'] += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = {'done': threading.Event(), 'result': None, 'error': None, 'waiters': 0}
+                self._calls[key] = call
+                leader = True
+            else:
+                call['waiters'] += 1
+                self._counters['coalesced'] += 1
+                self._counters['max_waiters'] = max(self._counters['max_waiters'], call['waiters'])
+                leader = False
+        
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+        
+        try:
+            call['result'] = fn(*args, **kwargs)
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._counters['executions'] += 1
+            if call['waiters']:
+                logger.info(f"🤝 {self.name}: one execution served {call['waiters']} waiting callers")
+            call['done'].set()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counters,
+                        in_flight=len(self._calls),
+                        waiting=sum(call['waiters'] for call in self._calls.values()))
+
+# Cache misses for the same query, and fetches of the same feed, run once no
+# matter how many requests arrive together (e.g. when a cache entry expires)
+_query_flight = SingleFlight('query')
+_fetch_flight = SingleFlight('feed fetch')
+
 # Cache for RSS feed results (to ensure pagination consistency)
-# Key: (source, timelimit, keywords_hash) -> Value: (articles, timestamp)
-_news_cache = {}
+# Key: (source, timelimit, keywords_hash) -> Value: (articles, timestamp, data_time)
+# Bounded so that every distinct keyword query does not stay in memory forever
 _cache_ttl = 60  # Cache for 60 seconds
+_news_cache = BoundedTTLCache(max_entries=200, max_bytes=16 * 1024 * 1024, ttl=_cache_ttl)
+# Base layer under _news_cache: fetched, time-filtered and sorted articles per
+# (source, timelimit), shared by every keyword query over the same feeds
+_base_cache = BoundedTTLCache(max_entries=32, max_bytes=16 * 1024 * 1024, ttl=_cache_ttl)
+# Pinned ranked lists behind pagination cursors: snapshot_id -> (articles, data_time, source).
+# A snapshot outlives the query cache so that later pages stay consistent with
+# the first one; the lists share their Article records with the caches above.
+_SNAPSHOT_TTL = int(os.getenv('NEWS_CURSOR_TTL', '600'))  # Cursor lifetime in seconds
+_RANKED_ENTRY_BYTES = 64   # Per-entry cost charged for ranked lists that share their records
+_snapshot_cache = BoundedTTLCache(max_entries=500, max_bytes=8 * 1024 * 1024, ttl=_SNAPSHOT_TTL)
+# id(ranked list) -> (ranked list, snapshot_id). The entry keeps the list alive,
+# so its id() cannot be reused by another list while the mapping exists.
+_snapshot_ids = BoundedTTLCache(max_entries=500, max_bytes=1024 * 1024, ttl=_SNAPSHOT_TTL)
+
+# Feeds are fetched concurrently: a multi-feed fetch shares one overall deadline,
+# and each feed gets whatever is left of it (capped at the per-feed timeout)
+_FEED_TIMEOUT = 10     # Max seconds for a single feed request
+_FETCH_DEADLINE = 12   # Max seconds for a whole multi-feed fetch
+_fetch_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='rss-fetch')
+
+# HTTP validators per feed, so unchanged feeds are neither re-downloaded nor re-parsed
+# Key: feed URL -> Value: dict with etag, last_modified, content_hash and the parsed articles
+_feed_validators = {}
+_feed_validators_lock = threading.Lock()
+
+# Failing feeds are remembered: after a failure a feed is not retried for a
+# short while (negative cache), and after several failures in a row its circuit
+# opens and only one probe request is let through per (growing) open period
+_NEGATIVE_CACHE_TTL = 15       # Seconds to skip a feed after a single failure
+_BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failures that open the circuit
+_BREAKER_OPEN_SECONDS = 30      # First open period; doubles after each failed probe
+_BREAKER_MAX_OPEN_SECONDS = 600
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one feed
+    
+    closed: requests go through; a failure blocks retries for the negative
+            cache TTL, and failure_threshold failures in a row open the circuit.
+    open: requests are refused until the open period ends.
+    half_open: a single probe is let through; success closes the circuit,
+               failure opens it again for twice as long.
+    """
+    
+    def __init__(self, failure_threshold: int = _BREAKER_FAILURE_THRESHOLD,
+                 open_seconds: float = _BREAKER_OPEN_SECONDS, max_open_seconds: float = _BREAKER_MAX_OPEN_SECONDS,
+                 negative_ttl: float = _NEGATIVE_CACHE_TTL):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.negative_ttl = negative_ttl
+        self.state = 'closed'
+        self.failures = 0          # Consecutive failures
+        self.last_error = None
+        self._open_period = open_seconds
+        self._retry_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._counters = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+    
+    def allow(self) -> bool:
+        """Whether a request may be sent now (claims the probe when half-open)"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._retry_at or self._probing:
+                self._counters['rejected'] += 1
+                return False
+            if self.state == 'open':
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                self._probing = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._counters['successes'] += 1
+            self.state = 'closed'
+            self.failures = 0
+            self.last_error = None
+            self._open_period = self.open_seconds
+            self._retry_at = 0.0
+            self._probing = False
+    
+    def release(self):
+        """Give back a claimed probe without an outcome (e.g. the request was cancelled)"""
+        with self._lock:
+            self._probing = False
+    
+    def record_failure(self, error: str):
+        with self._lock:
+            now = time.monotonic()
+            self._counters['failures'] += 1
+            self.failures += 1
+            self.last_error = error
+            if self.state == 'half_open':
+                # Failed probe: stay away twice as long
+                self._open_period = min(self._open_period * 2, self.max_open_seconds)
+                self._open(now)
+            elif self.failures >= self.failure_threshold:
+                self._open(now)
+            else:
+                self._retry_at = now + self.negative_ttl
+            self._probing = False
+    
+    def _open(self, now: float):
+        self.state = 'open'
+        self._retry_at = now + self._open_period
+        self._counters['opened'] += 1
+    
+    @property
+    def healthy(self) -> bool:
+        return self.state == 'closed'
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            retry_in = max(0.0, self._retry_at - time.monotonic())
+            return dict(self._counters, state=self.state, consecutive_failures=self.failures,
+                        retry_in_seconds=round(retry_in, 1), last_error=self.last_error)
+
+# Key: feed URL -> CircuitBreaker
+_feed_breakers = {}
+_feed_breakers_lock = threading.Lock()
+
+def _get_breaker(url: str) -> CircuitBreaker:
+    with _feed_breakers_lock:
+        breaker = _feed_breakers.get(url)
+        if breaker is None:
+            breaker = _feed_breakers[url] = CircuitBreaker()
+        return breaker
+
+# Keyword search: articles are tokenized with Vietnamese diacritic folding at
+# ingest time, so "bong da" matches "bóng đá" and queries never rescan article text
+_TOKEN_RE = re.compile(r'\w+')
+_COMBINING_MARKS_RE = re.compile(r'[\u0300-\u036f]')
+_OR_RE = re.compile(r'\s+OR\s+|\|')
+
+def fold_text(text: str) -> str:
+    """Lowercase and strip Vietnamese diacritics ('Bóng Đá' -> 'bong da')"""
+    text = text.lower().replace('đ', 'd')
+    return _COMBINING_MARKS_RE.sub('', unicodedata.normalize('NFD', text))
+
+def tokenize(text: str) -> List[str]:
+    """Split text into folded word tokens"""
+    return _TOKEN_RE.findall(fold_text(text))
+
+def _article_key(article: Article) -> str:
+    """Stable identity of an article (its URL, or its title when there is none)"""
+    return article.url or article.title
+
+class ArticleIndex:
+    """
+    Inverted index over article titles and excerpts with BM25 ranking
+    
+    Queries are AND over the words of a clause; clauses are joined with "OR"
+    (or "|"). Articles are added and removed incrementally as feeds refresh.
+    An article listed by several feeds is reference-counted and stays indexed
+    until the last feed drops it.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        # Term -> {article key: term frequency}
+        self._postings = defaultdict(dict)
+        # Article key -> {term: term frequency}, kept so an article can be removed
+        self._doc_terms = {}
+        # Article key -> number of feeds currently listing it
+        self._refs = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+    
+    def add(self, key: str, title: str, excerpt: str):
+        """Index an article, or add a reference if it is already indexed"""
+        with self._lock:
+            if key in self._refs:
+                self._refs[key] += 1
+                return
+        terms = defaultdict(int)
+        for term in tokenize(title):
+            terms[term] += self.title_weight
+        for term in tokenize(excerpt):
+            terms[term] += 1
+        with self._lock:
+            if key in self._refs:
+                self._refs[key] += 1
+                return
+            for term, tf in terms.items():
+                self._postings[term][key] = tf
+            self._doc_terms[key] = dict(terms)
+            self._refs[key] = 1
+            self._total_length += sum(terms.values())
+    
+    def remove(self, key: str):
+        """Drop one reference to an article; it leaves the index with the last one"""
+        with self._lock:
+            refs = self._refs.get(key)
+            if refs is None:
+                return
+            if refs > 1:
+                self._refs[key] = refs - 1
+                return
+            del self._refs[key]
+            terms = self._doc_terms.pop(key)
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(key, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= sum(terms.values())
+    
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+    
+    def search(self, query: str) -> Dict[str, float]:
+        """
+        Find articles matching a query
+        
+        Returns:
+            Article key -> BM25 score, for every matching article
+        """
+        clauses = [tokenize(clause) for clause in _OR_RE.split(query)]
+        scores = {}
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if doc_count == 0:
+                return scores
+            avg_length = self._total_length / doc_count
+            for terms in clauses:
+                if not terms:
+                    continue
+                postings = [self._postings.get(term, {}) for term in set(terms)]
+                # Intersect starting from the rarest term, so cost follows the smallest posting list
+                postings.sort(key=len)
+                matches = [key for key in postings[0] if all(key in p for p in postings[1:])]
+                for key in matches:
+                    length = sum(self._doc_terms[key].values())
+                    score = 0.0
+                    for p in postings:
+                        tf = p[key]
+                        idf = math.log(1 + (doc_count - len(p) + 0.5) / (len(p) + 0.5))
+                        score += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                    scores[key] = max(scores.get(key, 0.0), score)
+        return scores
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'articles': len(self._doc_terms), 'terms': len(self._postings)}
+
+_article_index = ArticleIndex()
+
+# Cross-source deduplication: syndicated or near-identical stories from different
+# feeds are grouped into one cluster at ingest, and merged results keep only the
+# first (newest, highest priority) article of each cluster
+_DEDUP_WINDOW = 10000        # Most recent articles remembered for duplicate detection
+_DEDUP_MAX_DISTANCE = 3      # Max differing SimHash bits for a near-duplicate
+_DEDUP_MIN_TOKENS = 6        # Shorter texts are only matched by URL
+_TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'zarsrc', 'zalo')
+
+def canonical_url(url: str) -> str:
+    """URL reduced to what identifies the story (no scheme, www/m. prefix, fragment or tracking parameters)"""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query) if not k.lower().startswith(_TRACKING_PARAMS))
+    canonical = host + (parsed.path.rstrip('/') or '/')
+    return canonical + ('?' + urlencode(query) if query else '')
+
+def _simhash(weighted_tokens: Dict[str, int]) -> int:
+    """64-bit SimHash of weighted tokens"""
+    weights = [0] * 64
+    for token, weight in weighted_tokens.items():
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += weight if (h >> bit) & 1 else -weight
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+class DedupIndex:
+    """
+    Rolling window of recent articles for duplicate detection
+    
+    An article joins the cluster of an earlier one when their canonical URLs
+    are equal, or when an article from another source has a SimHash (over the
+    folded title and excerpt) within _DEDUP_MAX_DISTANCE bits. SimHashes are
+    bucketed by four 16-bit bands: two fingerprints that close always share a
+    band, so each new article is compared against a handful of candidates
+    whatever the window size.
+    """
+    
+    def __init__(self, window: int = _DEDUP_WINDOW, max_distance: int = _DEDUP_MAX_DISTANCE):
+        self.window = window
+        self.max_distance = max_distance
+        # Article key -> cluster key (the key of the first article seen in the cluster)
+        self._cluster_of = {}
+        # Canonical URL -> (cluster key, key of the latest article with that URL);
+        # the entry leaves the window with that article
+        self._by_url = {}
+        # (band number, band value) -> [(fingerprint, source, cluster key)]
+        self._bands = defaultdict(list)
+        # Articles in arrival order: (article key, canonical url, band entries)
+        self._order = deque()
+        self._lock = threading.Lock()
+        self._counters = {'checked': 0, 'url_duplicates': 0, 'near_duplicates': 0}
+    
+    def add(self, article: Article) -> str:
+        """Assign an article to a cluster and return the cluster key"""
+        key = _article_key(article)
+        with self._lock:
+            if key in self._cluster_of:
+                return self._cluster_of[key]
+        
+        url = canonical_url(article.url) if article.url else ''
+        tokens = defaultdict(int)
+        for token in tokenize(article.title):
+            tokens[token] += 2
+        for token in tokenize(article.excerpt):
+            tokens[token] += 1
+        fingerprint = _simhash(tokens) if len(tokens) >= _DEDUP_MIN_TOKENS else None
+        
+        with self._lock:
+            self._counters['checked'] += 1
+            cluster = self._by_url[url][0] if url in self._by_url else None
+            if cluster is not None:
+                self._counters['url_duplicates'] += 1
+            elif fingerprint is not None:
+                cluster = self._find_near_duplicate(fingerprint, article.source)
+                if cluster is not None:
+                    self._counters['near_duplicates'] += 1
+            if cluster is None:
+                cluster = key
+            
+            self._cluster_of[key] = cluster
+            if url:
+                self._by_url[url] = (cluster, key)
+            band_entries = []
+            if fingerprint is not None:
+                entry = (fingerprint, article.source, cluster)
+                for band in range(4):
+                    band_key = (band, (fingerprint >> (16 * band)) & 0xFFFF)
+                    self._bands[band_key].append(entry)
+                    band_entries.append((band_key, entry))
+            self._order.append((key, url, band_entries))
+            while len(self._order) > self.window:
+                self._evict_oldest()
+            return cluster
+    
+    def _find_near_duplicate(self, fingerprint: int, source: str) -> Optional[str]:
+        for band in range(4):
+            band_key = (band, (fingerprint >> (16 * band)) & 0xFFFF)
+            for other, other_source, cluster in self._bands.get(band_key, ()):
+                if other_source != source and bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return cluster
+        return None
+    
+    def _evict_oldest(self):
+        key, url, band_entries = self._order.popleft()
+        self._cluster_of.pop(key, None)
+        if url and self._by_url.get(url, (None, None))[1] == key:
+            del self._by_url[url]
+        for band_key, entry in band_entries:
+            bucket = self._bands.get(band_key)
+            if bucket is not None:
+                bucket.remove(entry)
+                if not bucket:
+                    del self._bands[band_key]
+    
+    def cluster(self, article: Article) -> str:
+        """Cluster key of an article (its own key if it was never seen)"""
+        key = _article_key(article)
+        return self._cluster_of.get(key, key)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counters, window=len(self._order), urls=len(self._by_url))
+
+_dedup_index = DedupIndex()
+
+def _rank_key(article: Article):
+    """Ranking order: newest first (undated last), then lower feed priority first"""
+    return (-article.published_ts if article.published_ts is not None else math.inf, article.priority)
+
+class RankedArticles:
+    """
+    Ranked view over per-feed article runs, merged lazily
+    
+    Each run is already in _rank_key order, so the first k articles come out of
+    a heap merge in O(k log runs) and only the prefix that pages actually read
+    is materialized. With dedup, later members of a duplicate cluster are
+    skipped as the merge goes. The view never changes once built, so caches
+    and cursor snapshots can share it; it supports len(), indexing, slicing
+    and iteration like a list. truncated marks a view whose runs were cut at
+    the database row cap.
+    """
+    
+    def __init__(self, runs: List[List[Article]], dedup: bool = False, truncated: bool = False):
+        self.truncated = truncated
+        runs = [run for run in runs if run]
+        self._merged = heapq.merge(*runs, key=_rank_key)
+        self._items = []
+        self._exhausted = False
+        self._positions = None
+        self._lock = threading.Lock()
+        self._clusters = None
+        if dedup:
+            # Cluster ids are captured now so that the length and the items stay
+            # consistent while the dedup index keeps changing
+            self._clusters = {}
+            for run in runs:
+                for article in run:
+                    key = _article_key(article)
+                    self._clusters[key] = _dedup_index.cluster(article)
+            self._seen = set()
+            self._total = len(set(self._clusters.values()))
+        else:
+            self._total = sum(len(run) for run in runs)
+        self.raw_count = sum(len(run) for run in runs)
+    
+    def _fill(self, count: Optional[int] = None):
+        """Materialize the first count articles (all of them if count is None)"""
+        with self._lock:
+            while not self._exhausted and (count is None or len(self._items) < count):
+                article = next(self._merged, None)
+                if article is None:
+                    self._exhausted = True
+                    break
+                if self._clusters is not None:
+                    cluster = self._clusters[_article_key(article)]
+                    if cluster in self._seen:
+                        continue
+                    self._seen.add(cluster)
+                self._items.append(article)
+    
+    def __len__(self) -> int:
+        return self._total
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop = index.start or 0, index.stop
+            self._fill(stop if stop is not None and stop >= 0 and start >= 0 else None)
+        else:
+            self._fill(index + 1 if index >= 0 else None)
+        return self._items[index]
+    
+    def __iter__(self):
+        idx = 0
+        while True:
+            self._fill(idx + 1)
+            if idx >= len(self._items):
+                return
+            yield self._items[idx]
+            idx += 1
+    
+    def positions(self) -> Dict[str, int]:
+        """Article key -> rank index, over the fully merged list"""
+        if self._positions is None:
+            self._fill()
+            self._positions = {_article_key(article): idx for idx, article in enumerate(self._items)}
+        return self._positions
+
+def _time_window(run: List[Article], cutoff_ts: float) -> List[Article]:
+    """Articles of one run published after cutoff_ts, plus its undated ones"""
+    old_start = bisect.bisect_right(run, -cutoff_ts, key=lambda a: _rank_key(a)[0])
+    undated_start = bisect.bisect_left(run, math.inf, lo=old_start, key=lambda a: _rank_key(a)[0])
+    if old_start == undated_start:
+        return run
+    return run[:old_start] + run[undated_start:]
+
+def _dedup_articles(articles: List[Article]) -> List[Article]:
+    """Keep the first article of each duplicate cluster (input is already in ranking order)"""
+    seen = set()
+    unique = []
+    for article in articles:
+        cluster = _dedup_index.cluster(article)
+        if cluster in seen:
+            continue
+        seen.add(cluster)
+        unique.append(article)
+    return unique
+
+# Trending terms: title phrases (syllable bigrams) and entities (capitalized
+# runs, acronyms) are counted in two exponentially decayed count-min sketches,
+# a short window and a long baseline. A term trends when its recent count is
+# well above what its baseline predicts. Memory is fixed by the sketch size and
+# a bounded table of candidate terms; each article costs a constant number of
+# sketch updates.
+_TREND_SHORT_HALF_LIFE = 3600        # Seconds; the "recent" window
+_TREND_LONG_HALF_LIFE = 24 * 3600    # Seconds; the baseline
+_TREND_SKETCH_WIDTH = 4096
+_TREND_SKETCH_DEPTH = 4
+_TREND_MAX_CANDIDATES = 2000         # Recently seen terms that can be reported
+_TREND_MAX_TERMS = 32                # Terms taken from one title at most
+_TREND_MIN_MENTIONS = 2.0            # Decayed recent count needed to trend
+_TREND_MIN_SCORE = 1.5
+_TREND_STOPWORDS = frozenset("""
+    va cua la co cho trong nhung cac mot duoc voi nay da khi tai de tu ve sau truoc den ra vao
+    len bi thi ma nhu o nguoi nhieu se dang khong con cung hon theo tren duoi gi nao vi nen neu
+    hai ba so ngay nam thang sang toi chieu hom qua moi nhat rat viec tin the
+""".split())
+
+class DecayedCountMinSketch:
+    """
+    Count-min sketch whose counts decay with a half-life
+    
+    Uses forward decay: an update at time t adds exp(rate * (t - t0)) and an
+    estimate divides by exp(rate * (now - t0)), so counters are never decayed
+    one by one. The tables are rescaled once the weights grow large.
+    """
+    
+    _MAX_EXPONENT = 50.0
+    
+    def __init__(self, width: int, depth: int, half_life: float):
+        self.width = width
+        self.depth = depth
+        self.half_life = half_life
+        self._rate = math.log(2) / half_life
+        self._tables = [[0.0] * width for _ in range(depth)]
+        self._t0 = time.time()
+    
+    def _indexes(self, term_hash: int):
+        h1 = term_hash & 0xFFFFFFFF
+        h2 = (term_hash >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+    
+    def add(self, term_hash: int, ts: float, weight: float = 1.0):
+        exponent = self._rate * (ts - self._t0)
+        if exponent > self._MAX_EXPONENT:
+            self._rescale(ts)
+            exponent = 0.0
+        weight *= math.exp(exponent)
+        for table, idx in zip(self._tables, self._indexes(term_hash)):
+            table[idx] += weight
+    
+    def estimate(self, term_hash: int, now: float) -> float:
+        count = min(table[idx] for table, idx in zip(self._tables, self._indexes(term_hash)))
+        return count * math.exp(-self._rate * (now - self._t0))
+    
+    def _rescale(self, new_t0: float):
+        factor = math.exp(-self._rate * (new_t0 - self._t0))
+        for table in self._tables:
+            for idx in range(self.width):
+                table[idx] *= factor
+        self._t0 = new_t0
+
+def _term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), 'little')
+
+_CLAUSE_SPLIT_RE = re.compile(r'[,.:;!?()\[\]"“”‘’–—]|\s-\s')
+
+def _title_terms(title: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Candidate trending terms of a title
+    
+    Returns:
+        folded term -> (display form, kind) where kind is 'entity' or 'phrase'
+    """
+    terms = {}
+    for clause in _CLAUSE_SPLIT_RE.split(title):
+        words = _TOKEN_RE.findall(clause)
+        in_entity = [False] * len(words)
+        # Entities: runs of two or more capitalized words, and acronyms ("SJC", "U23")
+        start = 0
+        for i in range(len(words) + 1):
+            if i < len(words) and words[i][:1].isupper():
+                continue
+            if i - start >= 2:
+                entity = ' '.join(words[start:i])
+                terms[fold_text(entity)] = (entity, 'entity')
+                in_entity[start:i] = [True] * (i - start)
+            start = i + 1
+        for i, word in enumerate(words):
+            if len(word) >= 2 and word.isupper() and sum(ch.isalpha() for ch in word) >= 2:
+                terms.setdefault(fold_text(word), (word, 'entity'))
+                in_entity[i] = True
+        # Phrases: pairs of adjacent content syllables outside entities
+        folded = [fold_text(word) for word in words]
+        for i in range(len(words) - 1):
+            first, second = folded[i], folded[i + 1]
+            if in_entity[i] or in_entity[i + 1] or first in _TREND_STOPWORDS or second in _TREND_STOPWORDS:
+                continue
+            if not first.isalpha() or not second.isalpha():
+                continue
+            terms.setdefault(f"{first} {second}", (f"{words[i]} {words[i + 1]}".lower(), 'phrase'))
+        if len(terms) >= _TREND_MAX_TERMS:
+            break
+    return terms
+
+class TrendDetector:
+    """
+    Streaming burst detection over the terms of ingested articles
+    
+    Each term is counted in a short-window and a long-window decayed sketch.
+    Under a steady publishing rate the short count is the long count times
+    short_half_life / long_half_life; the burst score is how far the short
+    count is above that, in standard deviations (Poisson approximation).
+    """
+    
+    def __init__(self, short_half_life: float = _TREND_SHORT_HALF_LIFE, long_half_life: float = _TREND_LONG_HALF_LIFE,
+                 width: int = _TREND_SKETCH_WIDTH, depth: int = _TREND_SKETCH_DEPTH,
+                 max_candidates: int = _TREND_MAX_CANDIDATES):
+        self._short = DecayedCountMinSketch(width, depth, short_half_life)
+        self._long = DecayedCountMinSketch(width, depth, long_half_life)
+        self._expected_ratio = short_half_life / long_half_life
+        self.max_candidates = max_candidates
+        # Folded term -> dict with label, kind, hash and the latest titles, least recently seen first
+        self._candidates = OrderedDict()
+        # Article keys already counted (the same URL can come from several feeds)
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'articles': 0, 'term_updates': 0}
+    
+    def add(self, article: Article):
+        """Count the terms of one article (at its publication time)"""
+        key = _article_key(article)
+        terms = _title_terms(article.title)
+        now = time.time()
+        ts = min(article.published_ts or now, now)
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen[key] = None
+            if len(self._seen) > self.max_candidates * 4:
+                self._seen.popitem(last=False)
+            self._counters['articles'] += 1
+            for term, (label, kind) in terms.items():
+                candidate = self._candidates.get(term)
+                if candidate is None:
+                    candidate = {'label': label, 'kind': kind, 'hash': _term_hash(term), 'titles': deque(maxlen=3)}
+                    self._candidates[term] = candidate
+                    if len(self._candidates) > self.max_candidates:
+                        self._candidates.popitem(last=False)
+                else:
+                    self._candidates.move_to_end(term)
+                candidate['titles'].appendleft(article.title)
+                self._short.add(candidate['hash'], ts)
+                self._long.add(candidate['hash'], ts)
+                self._counters['term_updates'] += 1
+    
+    def trending(self, limit: int = 10) -> List[Dict]:
+        """Bursting terms, strongest burst first"""
+        now = time.time()
+        results = []
+        with self._lock:
+            for term, candidate in self._candidates.items():
+                recent = self._short.estimate(candidate['hash'], now)
+                if recent < _TREND_MIN_MENTIONS:
+                    continue
+                baseline = self._long.estimate(candidate['hash'], now)
+                expected = baseline * self._expected_ratio
+                score = (recent - expected) / math.sqrt(expected + 1)
+                if score < _TREND_MIN_SCORE:
+                    continue
+                results.append((term, {
+                    'term': candidate['label'],
+                    'kind': candidate['kind'],
+                    'score': round(score, 2),
+                    'recent_mentions': round(recent, 1),
+                    'baseline_per_hour': round(baseline * self._long._rate * 3600, 2),
+                    'example_titles': list(candidate['titles']),
+                }))
+        # An entity and the phrases inside it burst together; report only the entity
+        entities = [term for term, result in results if result['kind'] == 'entity']
+        results = [result for term, result in results
+                   if result['kind'] == 'entity' or not any(f" {term} " in f" {entity} " for entity in entities)]
+        results.sort(key=lambda r: -r['score'])
+        return results[:limit]
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counters, candidates=len(self._candidates))
+
+_trend_detector = TrendDetector()
+
+# On-disk article history: every fetched article is upserted by URL into SQLite
+# (WAL mode) with an FTS5 index, so week/month windows outlive the ~30 entries a
+# feed exposes and a restart starts warm. Set NEWS_DB_PATH='' to disable.
+_NEWS_DB_PATH = os.getenv('NEWS_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'news_articles.db'))
+_DB_RETENTION_DAYS = 35   # Longest timelimit is a month; keep a little more
+_DB_MAX_ROWS = 2000       # Max articles returned by one window query (responses say when it cut one)
+
+def _fts_query(query: str) -> str:
+    """Translate a keyword query (words ANDed, "OR" between alternatives) to FTS5 syntax"""
+    clauses = []
+    for clause in _OR_RE.split(query):
+        terms = tokenize(clause)
+        if terms:
+            clauses.append('(' + ' AND '.join(f'"{term}"' for term in terms) + ')')
+    return ' OR '.join(clauses)
+
+class ArticleDB:
+    """SQLite article store with an FTS5 index over folded title and excerpt"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    date TEXT,
+                    excerpt TEXT,
+                    published_ts REAL,
+                    priority INTEGER,           -- Feed that first stored it
+                    fetched_ts REAL NOT NULL,
+                    hot_score INTEGER,
+                    hot_keywords TEXT
+                )
+            """)
+            # Databases created before hotness was stored get the columns added;
+            # their rows are scored on read until the feed refreshes them
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+            for column, column_type in (('hot_score', 'INTEGER'), ('hot_keywords', 'TEXT')):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE articles ADD COLUMN {column} {column_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_ts)")
+            # The same URL can be listed by several feeds (tin-moi-nhat and a
+            # category feed), so feed membership is kept per (url, feed)
+            has_feeds = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_feeds'").fetchone()
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS article_feeds (
+                    url TEXT NOT NULL,
+                    feed_id INTEGER NOT NULL,
+                    PRIMARY KEY (url, feed_id)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_article_feeds_feed ON article_feeds(feed_id)")
+            if not has_feeds:
+                self._conn.execute("""
+                    INSERT OR IGNORE INTO article_feeds (url, feed_id)
+                    SELECT url, priority FROM articles WHERE priority IS NOT NULL
+                """)
+            self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(folded)")
+    
+    def upsert(self, articles: List[Article]):
+        """Insert new articles and refresh existing ones (matched by URL)"""
+        fetched_ts = time.time()
+        with self._lock, self._conn:
+            for article in articles:
+                if not article.url:
+                    continue
+                row = self._conn.execute("""
+                    INSERT INTO articles (url, title, source, date, excerpt, published_ts, priority, fetched_ts,
+                                          hot_score, hot_keywords)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        title=excluded.title, source=excluded.source, date=excluded.date,
+                        excerpt=excluded.excerpt, published_ts=excluded.published_ts,
+                        fetched_ts=excluded.fetched_ts,
+                        hot_score=excluded.hot_score, hot_keywords=excluded.hot_keywords
+                    RETURNING rowid
+                """, (article.url, article.title, article.source, article.date,
+                      article.excerpt, article.published_ts, article.priority, fetched_ts,
+                      article.hot_score, json.dumps(article.hot_keywords, ensure_ascii=False))).fetchone()
+                self._conn.execute("INSERT OR IGNORE INTO article_feeds (url, feed_id) VALUES (?, ?)",
+                                   (article.url, article.priority))
+                folded = fold_text(f"{article.title} {article.excerpt}")
+                self._conn.execute("INSERT OR REPLACE INTO articles_fts (rowid, folded) VALUES (?, ?)", (row[0], folded))
+    
+    def query(self, priorities: List[int], since: datetime, keywords: Optional[str] = None,
+              sort: str = 'date') -> Tuple[List[Article], bool]:
+        """
+        Articles from the given feeds published after since, newest first
+        
+        With keywords, matching goes through the FTS5 index; sort='relevance'
+        then orders by FTS5's bm25() instead of date. An article listed by
+        several of the feeds gets the lowest of their ids as its priority.
+        
+        Returns:
+            (articles, truncated) - truncated is True when more than
+            _DB_MAX_ROWS articles matched and only the first were returned
+        """
+        if not priorities:
+            return [], False
+        placeholders = ','.join('?' * len(priorities))
+        params = [*priorities]
+        sql = f"""
+            SELECT a.title, a.url, a.source, a.date, a.excerpt, a.published_ts,
+                   (SELECT MIN(af.feed_id) FROM article_feeds af
+                    WHERE af.url = a.url AND af.feed_id IN ({placeholders})) AS feed_priority,
+                   a.hot_score, a.hot_keywords
+            FROM articles a
+        """
+        # Undated articles count as published when they were fetched
+        where = (f"a.url IN (SELECT url FROM article_feeds WHERE feed_id IN ({placeholders})) AND "
+                 "(a.published_ts >= ? OR (a.published_ts IS NULL AND a.fetched_ts >= ?))")
+        where_params = [*priorities, since.timestamp(), since.timestamp()]
+        order = "a.published_ts IS NULL, a.published_ts DESC, feed_priority"
+        if keywords:
+            match = _fts_query(keywords)
+            if not match:
+                return [], False
+            sql += " JOIN articles_fts f ON f.rowid = a.rowid"
+            where = "articles_fts MATCH ? AND " + where
+            where_params.insert(0, match)
+            if sort == 'relevance':
+                order = "bm25(articles_fts), " + order
+        params += where_params
+        # One row past the cap tells whether the window was cut
+        sql += f" WHERE {where} ORDER BY {order} LIMIT {_DB_MAX_ROWS + 1}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        truncated = len(rows) > _DB_MAX_ROWS
+        return [_article_from_row(row) for row in rows[:_DB_MAX_ROWS]], truncated
+    
+    def latest_per_feed(self, priority: int, limit: int):
+        """
+        Most recent articles stored for one feed, used to start warm after a restart
+        
+        Returns:
+            (articles, fetched_at) - fetched_at is when the newest of them was fetched
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT a.title, a.url, a.source, a.date, a.excerpt, a.published_ts, af.feed_id,
+                       a.hot_score, a.hot_keywords, a.fetched_ts
+                FROM article_feeds af JOIN articles a ON a.url = af.url
+                WHERE af.feed_id = ?
+                ORDER BY a.published_ts IS NULL, a.published_ts DESC LIMIT ?
+            """, (priority, limit)).fetchall()
+        if not rows:
+            return [], None
+        fetched_at = datetime.fromtimestamp(max(row[9] for row in rows), tz=timezone.utc)
+        return [_article_from_row(row[:9]) for row in rows], fetched_at
+    
+    def prune(self, days: int = _DB_RETENTION_DAYS) -> int:
+        """Delete articles published (or, if undated, fetched) more than `days` ago"""
+        cutoff = time.time() - days * 86400
+        expired = "COALESCE(published_ts, fetched_ts) < ?"
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+                DELETE FROM articles_fts WHERE rowid IN (SELECT rowid FROM articles WHERE {expired})
+            """, (cutoff,))
+            self._conn.execute(f"""
+                DELETE FROM article_feeds WHERE url IN (SELECT url FROM articles WHERE {expired})
+            """, (cutoff,))
+            deleted = self._conn.execute(f"DELETE FROM articles WHERE {expired}", (cutoff,)).rowcount
+        return deleted
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        return {'path': self.path, 'articles': count}
+
+def _article_from_row(row) -> Article:
+    """Article record from an articles table row, with the hotness stored at ingest"""
+    title, url, source, date, excerpt, published_ts, priority, hot_score, hot_keywords = row
+    if priority is None:
+        priority = 999
+    if hot_score is None:
+        # Row written before hotness was stored
+        return make_article(title, url, source, date or '', excerpt or '', published_ts, priority)
+    return Article(title, url, sys.intern(source), date or '', excerpt or '', published_ts, priority,
+                   hot_score, tuple(json.loads(hot_keywords)) if hot_keywords else ())
+
+def _open_article_db() -> Optional[ArticleDB]:
+    """Open the on-disk store, or run memory-only if it is disabled or unusable"""
+    if not _NEWS_DB_PATH:
+        logger.info("💽 Article database disabled (NEWS_DB_PATH is empty)")
+        return None
+    try:
+        db = ArticleDB(_NEWS_DB_PATH)
+        logger.info(f"💽 Article database: {_NEWS_DB_PATH}")
+        return db
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️  Cannot open article database {_NEWS_DB_PATH}: {e} - running memory-only")
+        return None
+
+_article_db = _open_article_db()
+_DB_PRUNE_INTERVAL = 3600  # Seconds between retention sweeps
+
+# Background refresh: each feed is polled on its own interval and its latest
+# articles are kept in memory, so tool calls never wait on the network
+_MAX_PER_SOURCE = 30        # Articles kept per feed
+_REFRESH_INTERVAL = 60      # Default shortest seconds between polls of one feed
+_MAX_REFRESH_INTERVAL = 3600  # Default longest seconds between polls of one feed
+# Key: feed priority -> Value: dict with articles, fetched_at (last success) and checked_at
+_article_store = {}
+_article_store_lock = threading.Lock()
+_refresher_thread = None
+_refresher_stop = threading.Event()
+_warm_started = False
+_refreshing = set()  # Feed priorities with a refresh in flight
+
+# Feed registry, loaded from news_feeds.json (or $NEWS_FEEDS_CONFIG)
+_NEWS_FEEDS_PATH = os.getenv('NEWS_FEEDS_CONFIG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'news_feeds.json'))
+_DEFAULT_REQUEST_BUDGET = 60  # Max feed requests per minute across all feeds
+
+class FeedConfig(NamedTuple):
+    """
+    One configured feed
+    
+    The id doubles as the feed priority: among articles published at the same
+    time, lower ids rank first, and stored articles are tagged with it.
+    """
+    id: int
+    name: str           # Display name, used as the article source
+    source: str         # Source key used by the tools' source parameter
+    url: str
+    category: str = ''
+    min_interval: float = _REFRESH_INTERVAL
+    max_interval: float = _MAX_REFRESH_INTERVAL
+
+_BUILTIN_FEEDS = [
+    FeedConfig(1, "VnExpress", "vnexpress", "https://vnexpress.net/rss/tin-moi-nhat.rss", "tin-moi-nhat"),
+    FeedConfig(2, "Dân Trí", "dantri", "https://dantri.com.vn/rss/tin-moi-nhat.rss", "tin-moi-nhat"),
+]
+
+def _source_key(name: str) -> str:
+    """'Dân Trí' -> 'dantri'"""
+    folded = unicodedata.normalize('NFD', name.lower().replace('đ', 'd'))
+    return ''.join(ch for ch in folded if ch.isascii() and ch.isalnum())
+
+def _load_feed_registry(path: str):
+    """
+    Read the feed registry from a JSON config file
+    
+    Feeds marked "disabled" are skipped. Falls back to the built-in feeds if
+    the file is missing or invalid.
+    
+    Returns:
+        (feeds by id, request budget per minute)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        feeds = {}
+        for item in config.get('feeds', []):
+            if item.get('disabled'):
+                continue
+            feed = FeedConfig(
+                id=int(item['id']),
+                name=item['name'],
+                source=item.get('source') or _source_key(item['name']),
+                url=item['url'],
+                category=item.get('category', ''),
+                min_interval=float(item.get('min_interval', _REFRESH_INTERVAL)),
+                max_interval=float(item.get('max_interval', _MAX_REFRESH_INTERVAL)),
+            )
+            feeds[feed.id] = feed
+        if not feeds:
+            raise ValueError("no enabled feeds")
+        budget = float(config.get('request_budget_per_minute', _DEFAULT_REQUEST_BUDGET))
+        logger.info(f"🗂️  Loaded {len(feeds)} feeds from {path}")
+        return feeds, budget
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"⚠️  Cannot load feed registry {path}: {e} - using built-in feeds")
+        return {feed.id: feed for feed in _BUILTIN_FEEDS}, _DEFAULT_REQUEST_BUDGET
+
+FEED_REGISTRY, _REQUEST_BUDGET = _load_feed_registry(_NEWS_FEEDS_PATH)
+
+# Vietnamese news sources RSS feeds with priorities: id -> (source_name, url)
+RSS_FEEDS = {feed.id: (feed.name, feed.url) for feed in FEED_REGISTRY.values()}
+
+def _feed_label(priority: int) -> str:
+    """Human-readable feed name for logs and stats, e.g. 'VnExpress/the-thao'"""
+    feed = FEED_REGISTRY.get(priority)
+    if feed is None:
+        return RSS_FEEDS.get(priority, (str(priority), ''))[0]
+    return f"{feed.name}/{feed.category}" if feed.category else feed.name
+
+# Adaptive polling: each feed's interval follows its observed publish rate
+# (aiming at about one new article per poll) and is stretched further by the
+# share of polls that brought nothing new (304 or no new entries). When the
+# planned polls of all feeds exceed the request budget, every interval is
+# scaled up by the same factor.
+_TARGET_NEW_PER_POLL = 1.0
+_POLL_EWMA_ALPHA = 0.3
+# Key: feed priority -> Value: dict with interval, rate (new articles/s),
+# unchanged (EWMA of polls without new articles), polls and last_poll
+_feed_schedule = {}
+
+# Long-lived HTTP session shared by all feed fetches. Connections are kept alive
+# and pooled per host, so refreshes skip the DNS lookup and TCP+TLS handshake.
+_POOL_HOSTS = 10      # Number of hosts to keep connection pools for
+_POOL_PER_HOST = 4    # Max concurrent requests per host (extra requests wait for a free slot)
+
+# Per-host request slots. urllib3 can only wait for a pooled connection without a
+# timeout, so the wait happens here instead, bounded by the feed's timeout; the
+# async path keeps its own slots per event loop (see _async_host_slot)
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(_POOL_PER_HOST)
+        return slot
+
+def _create_http_session() -> requests.Session:
+    """Create the pooled keep-alive session used for RSS fetches"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_POOL_HOSTS, pool_maxsize=_POOL_PER_HOST)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    })
+    return session
+
+_http_session = _create_http_session()
+
+def get_http_pool_stats() -> Dict:
+    """Connection reuse counters per host"""
+    hosts = {}
+    for adapter in set(_http_session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[pool.host] = {
+                'requests': pool.num_requests,
+                'new_connections': pool.num_connections,
+                'reused_connections': max(0, pool.num_requests - pool.num_connections),
+            }
+    return {'hosts': hosts}
+
+def get_news_stats() -> Dict:
+    """Runtime counters for the news service (served by the hub at /stats)"""
+    return {
+        'http_pool': get_http_pool_stats(),
+        'article_store': get_article_store_stats(),
+        'news_cache': _news_cache.stats(),
+        'base_cache': _base_cache.stats(),
+        'cursor_snapshots': _snapshot_cache.stats(),
+        'single_flight': {'queries': _query_flight.stats(), 'feed_fetches': _fetch_flight.stats()},
+        'keyword_index': _article_index.stats(),
+        'dedup': _dedup_index.stats(),
+        'trending': _trend_detector.stats(),
+        'article_db': _article_db.stats() if _article_db is not None else None,
+    }
+
+# Incremental feed parsing: items are parsed one by one and parsing stops after
+# max_per_source items or at the first item that is not newer than the newest
+# one already known, so ingest CPU follows the number of new entries
+_STREAM_CHUNK = 16 * 1024
+_MAX_FEED_BYTES = 4 * 1024 * 1024   # Feeds larger than this are rejected
+_EXCERPT_CHARS = 300
+_ATOM_NS = '{http://www.w3.org/2005/Atom}'
+# Tags and entities, handled in a single pass
+_HTML_CLEAN_RE = re.compile(r'<[^>]*>|&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);')
+
+def _clean_html_match(match) -> str:
+    text = match.group(0)
+    return '' if text[0] == '<' else html.unescape(text)
+
+def _clean_html(text: str, limit: Optional[int] = None) -> str:
+    """Strip HTML tags and decode entities in one pass"""
+    text = _HTML_CLEAN_RE.sub(_clean_html_match, text).strip()
+    return text[:limit] if limit else text
+
+def _parse_date(text: str) -> Optional[float]:
+    """Epoch seconds from an RSS (RFC 822) or Atom (ISO 8601) date"""
+    if not text:
+        return None
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    # Ensure timezone aware
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def _article_from_element(item, source_name: str, priority: int) -> Article:
+    """Article from an RSS <item> or Atom <entry> element"""
+    if item.tag == 'item':
+        date = item.findtext('pubDate') or ''
+        url = item.findtext('link') or ''
+        title = item.findtext('title')
+        description = item.findtext('description') or ''
+    else:
+        date = item.findtext(_ATOM_NS + 'published') or item.findtext(_ATOM_NS + 'updated') or ''
+        link = item.find(_ATOM_NS + 'link')
+        url = link.get('href', '') if link is not None else ''
+        title = item.findtext(_ATOM_NS + 'title')
+        description = item.findtext(_ATOM_NS + 'summary') or item.findtext(_ATOM_NS + 'content') or ''
+    return make_article(
+        title=_clean_html(title) if title else 'No title',
+        url=url.strip(),
+        source=source_name,
+        date=date.strip(),
+        excerpt=_clean_html(description, _EXCERPT_CHARS),
+        published_ts=_parse_date(date.strip()),
+        priority=priority
+    )
+
+def _stream_parse_feed(chunks, source_name: str, max_items: int, high_water: Optional[float], priority: int):
+    """
+    Incrementally parse RSS/Atom items from an iterator of byte chunks
+    
+    Stops reading after max_items items, or at the first item published before
+    high_water (everything after it is already known). Items published in the
+    same second as high_water are still read, since they may be new.
+    
+    Returns:
+        (articles, stopped_early)
+    
+    Raises:
+        ET.ParseError: If the document is not well-formed XML
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    articles = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag != 'item' and elem.tag != _ATOM_NS + 'entry':
+                continue
+            article = _article_from_element(elem, source_name, priority)
+            elem.clear()
+            if high_water is not None and article.published_ts is not None and article.published_ts < high_water:
+                return articles, True
+            articles.append(article)
+            if len(articles) >= max_items:
+                return articles, True
+    parser.close()
+    return articles, False
+
+def _parse_feed_entries(content: bytes, source_name: str, max_per_source: int, priority: int = 999) -> List[Article]:
+    """Parse raw RSS content into article records with feedparser (fallback for feeds that are not well-formed XML)"""
+    feed = feedparser.parse(content)
+    
+    articles = []
+    for entry in feed.entries[:max_per_source]:
+        # Parse publication date
+        article_time = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            article_time = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+            article_time = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
+        elif hasattr(entry, 'published'):
+            try:
+                parsed = parsedate_to_datetime(entry.published)
+                # Ensure timezone aware
+                if parsed.tzinfo is None:
+                    article_time = parsed.replace(tzinfo=timezone.utc)
+                else:
+                    article_time = parsed
+            except:
+                pass
+        
+        # Get description/summary
+        description = ""
+        if hasattr(entry, 'description'):
+            description = entry.description
+        elif hasattr(entry, 'summary'):
+            description = entry.summary
+        
+        # Clean HTML tags from description
+        description = _clean_html(description, _EXCERPT_CHARS)
+        
+        article = make_article(
+            title=entry.title if hasattr(entry, 'title') else 'No title',
+            url=entry.link if hasattr(entry, 'link') else '',
+            source=source_name,
+            date=entry.published if hasattr(entry, 'published') else '',
+            excerpt=description,
+            published_ts=article_time.timestamp() if article_time else None,
+            priority=priority
+        )
+        articles.append(article)
+    return articles
+
+def _read_bounded(response, max_bytes: int) -> bytes:
+    """Read a streamed response body, refusing bodies larger than max_bytes"""
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(_STREAM_CHUNK):
+        size += len(chunk)
+        if size > max_bytes:
+            raise ValueError(f"feed is larger than {max_bytes} bytes")
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+def _parse_new_articles(content: bytes, source_name: str, max_per_source: int, priority: int,
+                        previous: Optional[List[Article]]) -> List[Article]:
+    """
+    Parse only the entries that are newer than the previously parsed ones
+    
+    New entries are put in front of the previous articles (which need no
+    re-parsing). Feeds that are not well-formed XML fall back to feedparser.
+    """
+    known_times = [a.published_ts for a in previous or () if a.published_ts is not None]
+    high_water = max(known_times) if known_times else None
+    view = memoryview(content)
+    chunks = (view[i:i + _STREAM_CHUNK] for i in range(0, len(content), _STREAM_CHUNK))
+    try:
+        new_articles, stopped_early = _stream_parse_feed(chunks, source_name, max_per_source, high_water, priority)
+    except ET.ParseError:
+        new_articles, stopped_early = None, False
+    
+    if new_articles is None or (not new_articles and not stopped_early):
+        # Not RSS/Atom that ElementTree understands (or no items found): full parse
+        articles = _parse_feed_entries(content, source_name, max_per_source, priority)
+        logger.info(f"     ✓ Got {len(articles)} articles from {source_name} (full parse)")
+        return articles
+    
+    new_count = len(new_articles)
+    if previous:
+        # Entries at high_water are parsed again; the known ones are replaced by key
+        new_keys = {_article_key(a) for a in new_articles}
+        kept = [a for a in previous if _article_key(a) not in new_keys]
+        new_count -= len(previous) - len(kept)
+        articles = (new_articles + kept)[:max_per_source]
+    else:
+        articles = new_articles
+    logger.info(f"     ✓ Got {new_count} new articles from {source_name} ({len(articles)} kept)")
+    return articles
+
+def _conditional_request(url: str, max_per_source: int):
+    """
+    Validators and request headers for a conditional GET of a feed
+    
+    Returns:
+        (validators, can_reuse, headers)
+    """
+    headers = {}
+    with _feed_validators_lock:
+        validators = _feed_validators.get(url)
+    # Validators only help if the articles parsed last time cover this request
+    can_reuse = validators is not None and validators['max_per_source'] >= max_per_source
+    if can_reuse:
+        if validators['etag']:
+            headers['If-None-Match'] = validators['etag']
+        if validators['last_modified']:
+            headers['If-Modified-Since'] = validators['last_modified']
+    return validators, can_reuse, headers
+
+def _articles_from_body(source_name: str, url: str, max_per_source: int, priority: int,
+                        validators: Optional[Dict], can_reuse: bool, content: bytes, response_headers) -> List[Article]:
+    """Parse a downloaded feed body (or reuse the last parse if unchanged) and remember its validators"""
+    content_hash = hashlib.sha1(content).hexdigest()
+    if can_reuse and validators['content_hash'] == content_hash:
+        logger.info(f"     ♻️  {source_name} body unchanged, reusing parsed articles")
+        articles = validators['articles'][:max_per_source]
+    else:
+        articles = _parse_new_articles(content, source_name, max_per_source, priority,
+                                       validators['articles'] if can_reuse else None)
+    
+    with _feed_validators_lock:
+        _feed_validators[url] = {
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'content_hash': content_hash,
+            'max_per_source': max_per_source,
+            'articles': articles,
+        }
+    return articles
+
+def fetch_rss_feed(source_name: str, url: str, max_per_source: int = 10, timeout: float = _FEED_TIMEOUT, priority: int = 999) -> List[Article]:
+    """
+    Fetch and parse RSS feed from a news source
+    
+    Returns [] without any request while the feed's circuit breaker refuses it,
+    or when no request slot for the feed's host frees up within timeout.
+    """
+    breaker = _get_breaker(url)
+    if not breaker.allow():
+        logger.info(f"  ⛔ Skipping {source_name}: circuit {breaker.state} (last error: {breaker.last_error})")
+        return []
+    slot = _host_slot(url)
+    if not slot.acquire(timeout=timeout):
+        logger.warning(f"     ⚠️  No free connection for {source_name} within {timeout:.0f}s, skipping")
+        breaker.release()
+        return []
+    try:
+        logger.info(f"  📡 Fetching from {source_name}...")
+        validators, can_reuse, headers = _conditional_request(url, max_per_source)
+        
+        # Fetch RSS with timeout over the shared keep-alive session
+        with _http_session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+            # Unchanged feed: reuse the articles parsed last time
+            if response.status_code == 304 and can_reuse:
+                logger.info(f"     ♻️  {source_name} not modified (304), reusing parsed articles")
+                breaker.record_success()
+                return validators['articles'][:max_per_source]
+            
+            response.raise_for_status()
+            content = _read_bounded(response, _MAX_FEED_BYTES)
+        
+        articles = _articles_from_body(source_name, url, max_per_source, priority,
+                                       validators, can_reuse, content, response.headers)
+        breaker.record_success()
+        return articles
+        
+    except requests.exceptions.Timeout:
+        logger.warning(f"     ⚠️  Timeout fetching {source_name}")
+        breaker.record_failure("timeout")
+        return []
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"     ⚠️  Error fetching {source_name}: {str(e)[:100]}")
+        breaker.record_failure(str(e)[:100])
+        return []
+    except Exception as e:
+        logger.warning(f"     ⚠️  Parse error for {source_name}: {str(e)[:100]}")
+        breaker.record_failure(f"parse error: {str(e)[:100]}")
+        return []
+    finally:
+        slot.release()
+
+def _fetch_feed_with_budget(source_name: str, url: str, max_per_source: int, deadline_at: float, priority: int) -> List[Article]:
+    """Fetch one feed using whatever is left of the shared deadline"""
+    remaining = deadline_at - time.monotonic()
+    if remaining <= 0:
+        logger.warning(f"     ⚠️  No time left to fetch {source_name}, skipping")
+        return []
+    # Refresher, revalidation and cold-start fetches of the same feed share one request
+    return _fetch_flight.do((url, max_per_source), fetch_rss_feed, source_name, url, max_per_source,
+                            timeout=min(_FEED_TIMEOUT, remaining), priority=priority)
+
+def _fetch_feeds(feeds, max_per_source: int, deadline: float) -> Dict[int, Optional[List[Article]]]:
+    """Fetch feeds in parallel; maps feed priority to its articles, or None if it missed the deadline"""
+    feeds = list(feeds)
+    if not feeds:
+        return {}
+    
+    start = time.monotonic()
+    deadline_at = start + deadline
+    futures = {}
+    for priority, (source_name, rss_url) in feeds:
+        future = _fetch_executor.submit(_fetch_feed_with_budget, source_name, rss_url, max_per_source, deadline_at, priority)
+        futures[future] = (priority, source_name)
+    
+    done, _ = wait(futures, timeout=deadline)
+    
+    # Collect in feed order so the result does not depend on which feed answered first
+    results = {}
+    for future, (priority, source_name) in futures.items():
+        if future not in done:
+            future.cancel()
+            logger.warning(f"     ⚠️  {source_name} missed the {deadline}s deadline, skipping")
+            results[priority] = None
+            continue
+        results[priority] = future.result()
+    
+    logger.info(f"⚡ Fetched {len(done)}/{len(feeds)} feeds in {time.monotonic() - start:.2f}s")
+    pool_hosts = get_http_pool_stats()['hosts'].values()
+    logger.info(f"🔌 Connections: {sum(h['requests'] for h in pool_hosts)} requests, "
+                f"{sum(h['reused_connections'] for h in pool_hosts)} on reused connections")
+    return results
+
+
+# Async fetch path for the MCP tools: the hub serves every service from one
+# event loop, so cold-start fetches there must not block it. Requests go
+# through a shared httpx client, each feed has a total timeout, and a cancelled
+# tool call stops waiting without cancelling fetches other sessions share.
+_async_client = None
+_async_client_loop = None
+# Key: (url, max_per_source) -> in-flight fetch task (only touched from the event loop)
+_async_fetches = {}
+# Key: host -> asyncio.Semaphore; httpx only limits connections overall, so
+# the per-host limit is applied here (reset along with the client)
+_async_host_slots = {}
+
+def _get_async_client() -> httpx.AsyncClient:
+    """The pooled async HTTP client for the running event loop"""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_host_slots.clear()
+        connections = _POOL_HOSTS * _POOL_PER_HOST
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            headers={'User-Agent': _http_session.headers['User-Agent']},
+            follow_redirects=True,
+        )
+        _async_client_loop = loop
+    return _async_client
+
+def _async_host_slot(url: str) -> asyncio.Semaphore:
+    """Per-host request slot for the async client (call after _get_async_client)"""
+    host = urlparse(url).netloc
+    slot = _async_host_slots.get(host)
+    if slot is None:
+        slot = _async_host_slots[host] = asyncio.Semaphore(_POOL_PER_HOST)
+    return slot
+
+async def close_async_client():
+    """Close the async HTTP client (call on shutdown)"""
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+    _async_client = _async_client_loop = None
+
+async def _read_bounded_async(response: httpx.Response, max_bytes: int) -> bytes:
+    """Async version of _read_bounded"""
+    chunks = []
+    size = 0
+    async for chunk in response.aiter_bytes(_STREAM_CHUNK):
+        size += len(chunk)
+        if size > max_bytes:
+            raise ValueError(f"feed is larger than {max_bytes} bytes")
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+async def fetch_rss_feed_async(source_name: str, url: str, max_per_source: int = 10, timeout: float = _FEED_TIMEOUT, priority: int = 999) -> List[Article]:
+    """
+    Async version of fetch_rss_feed (same validators, breaker and parsing)
+    
+    timeout bounds the whole request, body and the wait for a per-host slot
+    included. Parsing runs in a worker thread so a large feed does not hold up
+    the event loop.
+    """
+    breaker = _get_breaker(url)
+    if not breaker.allow():
+        logger.info(f"  ⛔ Skipping {source_name}: circuit {breaker.state} (last error: {breaker.last_error})")
+        return []
+    client = _get_async_client()
+    slot = _async_host_slot(url)
+    waited_from = time.monotonic()
+    try:
+        await asyncio.wait_for(slot.acquire(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"     ⚠️  No free connection for {source_name} within {timeout:.0f}s, skipping")
+        breaker.release()
+        return []
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    timeout -= time.monotonic() - waited_from
+    try:
+        logger.info(f"  📡 Fetching from {source_name} (async)...")
+        validators, can_reuse, headers = _conditional_request(url, max_per_source)
+        
+        async def download():
+            async with client.stream('GET', url, headers=headers) as response:
+                if response.status_code == 304 and can_reuse:
+                    return response, None
+                response.raise_for_status()
+                return response, await _read_bounded_async(response, _MAX_FEED_BYTES)
+        
+        response, content = await asyncio.wait_for(download(), timeout)
+        if content is None:
+            logger.info(f"     ♻️  {source_name} not modified (304), reusing parsed articles")
+            breaker.record_success()
+            return validators['articles'][:max_per_source]
+        
+        articles = await asyncio.to_thread(_articles_from_body, source_name, url, max_per_source, priority,
+                                           validators, can_reuse, content, response.headers)
+        breaker.record_success()
+        return articles
+        
+    except asyncio.CancelledError:
+        # Neither a success nor a failure of the feed
+        breaker.release()
+        raise
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        logger.warning(f"     ⚠️  Timeout fetching {source_name}")
+        breaker.record_failure("timeout")
+        return []
+    except httpx.HTTPError as e:
+        logger.warning(f"     ⚠️  Error fetching {source_name}: {str(e)[:100]}")
+        breaker.record_failure(str(e)[:100] or type(e).__name__)
+        return []
+    except Exception as e:
+        logger.warning(f"     ⚠️  Parse error for {source_name}: {str(e)[:100]}")
+        breaker.record_failure(f"parse error: {str(e)[:100]}")
+        return []
+    finally:
+        slot.release()
+
+async def _fetch_feed_shared_async(source_name: str, url: str, max_per_source: int, timeout: float, priority: int) -> List[Article]:
+    """Join an in-flight async fetch of the same feed, or start one"""
+    key = (url, max_per_source)
+    task = _async_fetches.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(fetch_rss_feed_async(source_name, url, max_per_source, timeout, priority))
+        _async_fetches[key] = task
+        task.add_done_callback(lambda done, key=key: _async_fetches.pop(key, None) if _async_fetches.get(key) is done else None)
+    # Shielded: a cancelled caller leaves the fetch running for the others
+    return await asyncio.shield(task)
+
+async def _fetch_feeds_async(feeds, max_per_source: int, deadline: float) -> Dict[int, Optional[List[Article]]]:
+    """Async version of _fetch_feeds"""
+    feeds = list(feeds)
+    if not feeds:
+        return {}
+    start = time.monotonic()
+    tasks = {}
+    for priority, (source_name, rss_url) in feeds:
+        tasks[priority] = asyncio.ensure_future(
+            _fetch_feed_shared_async(source_name, rss_url, max_per_source, min(_FEED_TIMEOUT, deadline), priority))
+    try:
+        done, _ = await asyncio.wait(tasks.values(), timeout=deadline)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    
+    results = {}
+    for priority, (source_name, _) in feeds:
+        task = tasks[priority]
+        if task not in done:
+            logger.warning(f"     ⚠️  {source_name} missed the {deadline}s deadline, skipping")
+            results[priority] = None
+        else:
+            results[priority] = task.result()
+    logger.info(f"⚡ Fetched {len(done)}/{len(feeds)} feeds in {time.monotonic() - start:.2f}s (async)")
+    return results
+
+def _refresh_feeds(feeds):
+    """Fetch the given feeds and update the in-memory article store"""
+    feeds = list(feeds)
+    with _article_store_lock:
+        _refreshing.update(p for p, _ in feeds)
+    try:
+        _refresh_feeds_now(feeds)
+    finally:
+        with _article_store_lock:
+            _refreshing.difference_update(p for p, _ in feeds)
+
+def _refresh_feeds_now(feeds):
+    _apply_refresh_results(_fetch_feeds(feeds, _MAX_PER_SOURCE, _FETCH_DEADLINE))
+
+async def _refresh_feeds_async(feeds):
+    """Async version of _refresh_feeds"""
+    feeds = list(feeds)
+    with _article_store_lock:
+        _refreshing.update(p for p, _ in feeds)
+    try:
+        results = await _fetch_feeds_async(feeds, _MAX_PER_SOURCE, _FETCH_DEADLINE)
+        await asyncio.to_thread(_apply_refresh_results, results)
+    finally:
+        with _article_store_lock:
+            _refreshing.difference_update(p for p, _ in feeds)
+
+def _apply_refresh_results(results: Dict[int, Optional[List[Article]]]):
+    """Store fetched articles per feed (failed feeds keep their last good ones) and save them"""
+    now = datetime.now(timezone.utc)
+    fetched = []
+    with _article_store_lock:
+        for priority, articles in results.items():
+            entry = _article_store.setdefault(priority, {'articles': [], 'fetched_at': None, 'checked_at': None})
+            entry['checked_at'] = now
+            # A failed fetch keeps the last good articles
+            new_count = 0
+            if articles:
+                new_count = _store_feed_articles(entry, articles, now)
+                fetched.extend(articles)
+            _record_poll(priority, new_count, articles or [])
+    
+    if _article_db is not None and fetched:
+        try:
+            _article_db.upsert(fetched)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Could not save articles to database: {e}")
+
+def _store_feed_articles(entry: Dict, articles: List[Article], fetched_at: datetime):
+    """
+    Replace a feed's articles in the store and update the keyword index (store lock held)
+    
+    Returns:
+        Number of articles that were not in the store before
+    """
+    # Kept in ranking order so queries can merge feeds without sorting
+    articles = sorted(articles, key=_rank_key)
+    old_keys = {_article_key(a) for a in entry['articles']}
+    new_keys = {_article_key(a): a for a in articles}
+    entry['articles'] = articles
+    entry['fetched_at'] = fetched_at
+    added = [a for k, a in new_keys.items() if k not in old_keys]
+    _update_index(added, old_keys - new_keys.keys())
+    return len(added)
+
+def _record_poll(priority: int, new_count: int, articles: List[Article]):
+    """Update a feed's publish rate and poll interval after a poll (store lock held)"""
+    feed = FEED_REGISTRY.get(priority)
+    min_interval = feed.min_interval if feed else _REFRESH_INTERVAL
+    max_interval = feed.max_interval if feed else _MAX_REFRESH_INTERVAL
+    now = time.monotonic()
+    state = _feed_schedule.get(priority)
+    if state is None:
+        # First poll: estimate the publish rate from the spread of publication times
+        times = [a.published_ts for a in articles if a.published_ts]
+        span = max(times) - min(times) if len(times) > 1 else 0
+        state = {'rate': (len(times) - 1) / span if span > 0 else 0.0,
+                 'unchanged': 0.0, 'polls': 0, 'interval': min_interval}
+        _feed_schedule[priority] = state
+    else:
+        elapsed = max(now - state['last_poll'], 1.0)
+        state['rate'] += _POLL_EWMA_ALPHA * (new_count / elapsed - state['rate'])
+        state['unchanged'] += _POLL_EWMA_ALPHA * ((1.0 if new_count == 0 else 0.0) - state['unchanged'])
+    state['polls'] += 1
+    state['last_poll'] = now
+    
+    interval = _TARGET_NEW_PER_POLL / state['rate'] if state['rate'] > 0 else max_interval
+    interval *= 1 + state['unchanged']
+    state['interval'] = min(max(interval, min_interval), max_interval)
+
+def _budget_scale() -> float:
+    """Factor applied to every poll interval to keep total requests within budget"""
+    planned = sum(60.0 / _feed_schedule[p]['interval'] if p in _feed_schedule
+                  else 60.0 / (FEED_REGISTRY[p].min_interval if p in FEED_REGISTRY else _REFRESH_INTERVAL)
+                  for p in RSS_FEEDS)
+    return max(1.0, planned / _REQUEST_BUDGET)
+
+def _warm_start_from_db():
+    """Fill the in-memory store from the on-disk database after a restart"""
+    if _article_db is None:
+        return
+    loaded = 0
+    for priority in list(RSS_FEEDS):
+        try:
+            articles, fetched_at = _article_db.latest_per_feed(priority, _MAX_PER_SOURCE)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Could not read articles from database: {e}")
+            return
+        if not articles:
+            continue
+        with _article_store_lock:
+            if priority in _article_store:
+                continue
+            entry = {'articles': [], 'fetched_at': None, 'checked_at': None}
+            _store_feed_articles(entry, articles, fetched_at)
+            _article_store[priority] = entry
+        loaded += len(articles)
+    if loaded:
+        logger.info(f"💽 Warm start: loaded {loaded} articles from {_article_db.path}")
+
+def _update_index(added_articles: List[Article], removed_keys):
+    """Incrementally update the keyword, duplicate and trend indexes after a feed refresh"""
+    for article in added_articles:
+        _article_index.add(_article_key(article), article.title, article.excerpt)
+        _dedup_index.add(article)
+        _trend_detector.add(article)
+    for key in removed_keys:
+        _article_index.remove(key)
+
+def _refresh_loop():
+    """Background thread: poll each feed on its own interval"""
+    logger.info("🔄 Background feed refresher started")
+    next_due = {}
+    next_prune = time.monotonic()
+    first_poll_at = next_prune
+    while not _refresher_stop.is_set():
+        now = time.monotonic()
+        # Feeds never polled yet get their first poll spread out at the budgeted rate
+        for priority in sorted(RSS_FEEDS):
+            if priority in next_due:
+                continue
+            if priority in _feed_schedule:
+                # Already fetched in the foreground (cold start)
+                next_due[priority] = now + _feed_schedule[priority]['interval']
+            else:
+                first_poll_at = max(first_poll_at, now)
+                next_due[priority] = first_poll_at
+                first_poll_at += 60.0 / _REQUEST_BUDGET
+        if _article_db is not None and now >= next_prune:
+            try:
+                deleted = _article_db.prune()
+                if deleted:
+                    logger.info(f"🧹 Pruned {deleted} articles older than {_DB_RETENTION_DAYS} days")
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Database prune failed: {e}")
+            next_prune = now + _DB_PRUNE_INTERVAL
+        due = [(p, feed) for p, feed in list(RSS_FEEDS.items()) if next_due.get(p, 0) <= now]
+        if due:
+            try:
+                _refresh_feeds(due)
+            except Exception as e:
+                logger.error(f"❌ Background refresh failed: {e}")
+            finished = time.monotonic()
+            with _article_store_lock:
+                scale = _budget_scale()
+                for priority, _ in due:
+                    state = _feed_schedule.get(priority)
+                    next_due[priority] = finished + (state['interval'] if state else _REFRESH_INTERVAL) * scale
+        wait_for = min((next_due[p] for p in RSS_FEEDS if p in next_due), default=now + 1) - time.monotonic()
+        _refresher_stop.wait(min(max(wait_for, 0.5), _REFRESH_INTERVAL))
+    logger.info("🛑 Background feed refresher stopped")
+
+def start_background_refresh():
+    """Start the background feed refresher (safe to call more than once)"""
+    global _refresher_thread, _warm_started
+    if not _warm_started:
+        _warm_started = True
+        _warm_start_from_db()
+    with _article_store_lock:
+        if _refresher_thread is not None and _refresher_thread.is_alive():
+            return
+        _refresher_stop.clear()
+        _refresher_thread = threading.Thread(target=_refresh_loop, name='feed-refresher', daemon=True)
+        _refresher_thread.start()
+
+def stop_background_refresh():
+    """Stop the background feed refresher"""
+    _refresher_stop.set()
+
+def _get_feed_runs(feeds):
+    """
+    Articles for the given feeds, read from the in-memory store
+    
+    Feeds that were never fetched yet (cold start) are fetched once in the
+    foreground; everything after that is kept fresh by the background refresher.
+    
+    Returns:
+        (runs, data_time) - one list of stored article records per feed, each in
+        ranking order, and when the oldest of those feeds was last fetched
+    """
+    feeds = list(feeds)
+    data_time = _ensure_feeds_loaded(feeds)
+    runs = []
+    with _article_store_lock:
+        for priority, _ in feeds:
+            entry = _article_store.get(priority)
+            if entry:
+                runs.append(entry['articles'])
+    return runs, data_time
+
+def _ensure_feeds_loaded(feeds) -> Optional[datetime]:
+    """
+    Make sure every feed has been fetched at least once (cold start) and
+    return when the oldest of them was last fetched
+    """
+    start_background_refresh()
+    with _article_store_lock:
+        missing = [(p, feed) for p, feed in feeds if p not in _article_store]
+    if missing:
+        logger.info(f"🥶 Cold start: fetching {len(missing)} feeds in the foreground")
+        _refresh_feeds(missing)
+    
+    with _article_store_lock:
+        fetch_times = [_article_store[p]['fetched_at'] for p, _ in feeds
+                       if p in _article_store and _article_store[p]['fetched_at']]
+    return min(fetch_times) if fetch_times else None
+
+def _stale_feeds(feeds) -> List[Dict]:
+    """
+    Selected feeds whose served articles may be out of date (stale-while-revalidate)
+    
+    A feed is stale when its circuit breaker is not closed ('unavailable'),
+    when its last refresh failed ('refresh_failed'), or when its data is older
+    than twice its poll interval ('refreshing'). The stored articles are served
+    either way; outdated feeds are refreshed in the background.
+    """
+    now = datetime.now(timezone.utc)
+    stale, revalidate = [], []
+    with _article_store_lock:
+        scale = _budget_scale()
+        for priority, (source_name, url) in feeds:
+            entry = _article_store.get(priority)
+            if entry is None:
+                continue
+            fetched_at = entry['fetched_at']
+            age = (now - fetched_at).total_seconds() if fetched_at else None
+            breaker = _feed_breakers.get(url)
+            schedule = _feed_schedule.get(priority)
+            interval = (schedule['interval'] if schedule else _REFRESH_INTERVAL) * scale
+            if breaker is not None and not breaker.healthy:
+                reason = 'unavailable'
+            elif fetched_at is None or (entry['checked_at'] and entry['checked_at'] > fetched_at):
+                reason = 'refresh_failed'
+            elif age > 2 * interval:
+                reason = 'refreshing'
+                if priority not in _refreshing:
+                    _refreshing.add(priority)
+                    revalidate.append((priority, (source_name, url)))
+            else:
+                continue
+            stale.append({'source': _feed_label(priority), 'reason': reason,
+                          'age_seconds': int(age) if age is not None else None})
+    if revalidate:
+        logger.info(f"🔁 Serving stale data, revalidating {len(revalidate)} feeds in the background")
+        threading.Thread(target=_revalidate, args=(revalidate,), name='feed-revalidate', daemon=True).start()
+    return stale
+
+def _revalidate(feeds):
+    try:
+        _refresh_feeds(feeds)
+    except Exception as e:
+        logger.error(f"❌ Background revalidation failed: {e}")
+
+async def _ensure_feeds_loaded_async(feeds):
+    """Async version of the cold-start part of _ensure_feeds_loaded"""
+    start_background_refresh()
+    with _article_store_lock:
+        missing = [(p, feed) for p, feed in feeds if p not in _article_store]
+    if missing:
+        logger.info(f"🥶 Cold start: fetching {len(missing)} feeds (async)")
+        await _refresh_feeds_async(missing)
+
+def get_article_store_stats() -> Dict:
+    """Size and staleness of the in-memory article store"""
+    now = datetime.now(timezone.utc)
+    feeds = {}
+    with _article_store_lock:
+        for priority, entry in _article_store.items():
+            schedule = _feed_schedule.get(priority, {})
+            feeds[_feed_label(priority)] = {
+                'articles': len(entry['articles']),
+                'age_seconds': int((now - entry['fetched_at']).total_seconds()) if entry['fetched_at'] else None,
+                'poll_interval': int(schedule['interval']) if schedule else None,
+                'new_per_hour': round(schedule['rate'] * 3600, 1) if schedule else None,
+                'unchanged_ratio': round(schedule['unchanged'], 2) if schedule else None,
+                'circuit': _feed_breakers[RSS_FEEDS[priority][1]].stats()
+                           if priority in RSS_FEEDS and RSS_FEEDS[priority][1] in _feed_breakers else None,
+            }
+        scale = _budget_scale()
+        planned = sum(60.0 / (_feed_schedule[p]['interval'] * scale) for p in RSS_FEEDS if p in _feed_schedule)
+    running = _refresher_thread is not None and _refresher_thread.is_alive()
+    return {
+        'refresher_running': running,
+        'feed_count': len(RSS_FEEDS),
+        'request_budget_per_minute': _REQUEST_BUDGET,
+        'planned_requests_per_minute': round(planned, 1),
+        'feeds': feeds,
+    }
+
+def _data_age_seconds(data_time: Optional[datetime], now: datetime) -> Optional[int]:
+    """How old the served feed data is, in seconds (None if never fetched)"""
+    if data_time is None:
+        return None
+    return int((now - data_time).total_seconds())
+
+def _feed_matches(priority: int, source_name: str, wanted: str) -> bool:
+    """Whether a feed is selected by a source parameter (already lower-cased)"""
+    feed = FEED_REGISTRY.get(priority)
+    key = feed.source if feed else _source_key(source_name)
+    category = feed.category if feed else ''
+    return wanted in (key, category, f"{key}/{category}", str(priority)) or _source_key(wanted) == key
+
+def _select_feeds(source: str):
+    """
+    RSS_FEEDS entries for a source parameter
+    
+    source can be a source key ('vnexpress', 'dantri'), a category ('the-thao'),
+    both ('vnexpress/the-thao'), a feed id, or 'all'. Unknown values select all feeds.
+    """
+    if source != 'all':
+        wanted = source.strip().lower()
+        selected = [(p, feed) for p, feed in RSS_FEEDS.items() if _feed_matches(p, feed[0], wanted)]
+        if selected:
+            return selected
+        logger.warning(f"Unknown source '{source}', using all feeds")
+    return list(RSS_FEEDS.items())
+
+def _source_label(source: str) -> str:
+    """Log label for a source parameter"""
+    if source == 'all':
+        return "all sources"
+    return f"source '{source}'"
+
+def _get_cutoff_time(timelimit: str, now: datetime) -> datetime:
+    """Oldest publication time allowed for a timelimit"""
+    if timelimit == 'w':
+        return now - timedelta(weeks=1)
+    if timelimit == 'm':
+        return now - timedelta(days=30)
+    return now - timedelta(hours=24)
+
+def _get_base_articles(source: str, timelimit: str) -> Tuple[RankedArticles, Optional[datetime]]:
+    """
+    Base cache layer: fetched, time-filtered and ranked articles per (source, timelimit)
+    
+    Every keyword query over the same source and time range shares this view,
+    so a new keyword costs an in-memory filter instead of a feed fetch. Feeds
+    are merged lazily, so a first page costs O(k log feeds) instead of a sort
+    over every article.
+    
+    Returns:
+        (articles, data_time)
+    """
+    base_key = (source, timelimit)
+    cached = _base_cache.get(base_key)
+    if cached is not None:
+        return cached
+    return _query_flight.do(('base',) + base_key, _build_base_articles, source, timelimit)
+
+def _build_base_articles(source: str, timelimit: str) -> Tuple[RankedArticles, Optional[datetime]]:
+    base_key = (source, timelimit)
+    now = datetime.now(timezone.utc)
+    cutoff_time = _get_cutoff_time(timelimit, now)
+    logger.info(f"⏰ Filtering articles after: {cutoff_time.strftime('%Y-%m-%d %H:%M')}")
+    
+    feeds_to_fetch = _select_feeds(source)
+    if timelimit in ('w', 'm') and _article_db is not None:
+        # Longer windows than a feed exposes come from the on-disk history,
+        # already filtered and in ranking order
+        data_time = _ensure_feeds_loaded(feeds_to_fetch)
+        rows, truncated = _article_db.query([p for p, _ in feeds_to_fetch], cutoff_time)
+        runs = [rows]
+        logger.info(f"💽 Loaded {len(rows)} articles from database for timelimit '{timelimit}'")
+        if truncated:
+            logger.warning(f"⚠️  Window capped at {_DB_MAX_ROWS} articles, older ones are left out")
+    else:
+        # Served from the in-memory store kept fresh by the background refresher
+        stored, data_time = _get_feed_runs(feeds_to_fetch)
+        total = sum(len(run) for run in stored)
+        logger.info(f"📊 Total fetched: {total} articles from {len(feeds_to_fetch)} sources")
+        
+        # Filter by time (each run is newest first, so this is a binary search)
+        cutoff_ts = cutoff_time.timestamp()
+        runs = [_time_window(run, cutoff_ts) for run in stored]
+        truncated = False
+        filtered_count = total - sum(len(run) for run in runs)
+        if filtered_count > 0:
+            logger.info(f"🗑️  Filtered out {filtered_count} old articles")
+    
+    # Ranked by: 1) Date (descending - newest first, undated last), 2) Source priority (ascending)
+    articles = RankedArticles(runs, dedup=len(feeds_to_fetch) > 1, truncated=truncated)
+    if len(articles) < articles.raw_count:
+        logger.info(f"🧬 Removed {articles.raw_count - len(articles)} duplicate articles across sources")
+    
+    _base_cache.set(base_key, (articles, data_time), size=articles.raw_count * _RANKED_ENTRY_BYTES)
+    return articles, data_time
+
+def _dedup_with_log(articles: List[Article]) -> List[Article]:
+    """Drop cross-feed duplicates from a merged, sorted list"""
+    unique = _dedup_articles(articles)
+    if len(unique) < len(articles):
+        logger.info(f"🧬 Removed {len(articles) - len(unique)} duplicate articles across sources")
+    return unique
+
+def _filter_by_keywords(articles: RankedArticles, keywords: str, sort: str = 'date') -> List[Article]:
+    """
+    Articles matching a keyword query, looked up in the inverted index
+    
+    Args:
+        articles: Base articles, in ranking order
+        keywords: Query; words are ANDed, "OR" separates alternatives, accents are optional
+        sort: 'date' keeps the newest-first order, 'relevance' orders by BM25 score
+    """
+    scores = _article_index.search(keywords)
+    positions = articles.positions()
+    matched = [(positions[key], score) for key, score in scores.items() if key in positions]
+    if sort == 'relevance':
+        matched.sort(key=lambda m: (-m[1], m[0]))
+    else:
+        matched.sort()
+    return [articles[idx] for idx, _ in matched]
+
+def _paginate(articles: List[Article], offset: int, max_results: int,
+              fields: Optional[Tuple[str, ...]] = None, excerpt_chars: Optional[int] = None) -> List[Dict]:
+    """Ranked response items for one page, with only the requested fields"""
+    news_results = []
+    for idx, article in enumerate(articles[offset:offset + max_results], start=offset+1):
+        date = article.date
+        
+        # Log with priority indicator
+        priority_label = f"P{article.priority}" if article.priority <= 8 else "Other"
+        logger.info(f"  ✓ [{idx}] {article.title[:60]}...")
+        logger.info(f"       Source: {article.source} ({priority_label}) | Date: {date[:10] if date else 'N/A'}")
+        
+        news_results.append(article_view(article, idx, fields, excerpt_chars))
+    return news_results
+
+def _pin_snapshot(articles: List[Article], data_time: Optional[datetime], source: str, kind: str,
+                  truncated: bool = False) -> str:
+    """
+    Pin a ranked list for cursor pagination and return its snapshot id
+    
+    kind names the tool that built the list ('latest' or 'hot'), so a cursor
+    is only continued by the tool that handed it out; truncated is carried to
+    later pages.
+    
+    Ranked lists are never mutated once cached, so the same list object maps to
+    the same snapshot while it is pinned: first-page calls served from one cache
+    entry share a snapshot instead of creating one each. Snapshot ids are random,
+    so a cursor whose snapshot has expired can never resolve to another list.
+    """
+    known = _snapshot_ids.get((id(articles), kind))
+    if known is not None and known[0] is articles and _snapshot_cache.get(known[1]) is not None:
+        return known[1]
+    snapshot_id = secrets.token_urlsafe(9)
+    _snapshot_cache.set(snapshot_id, (articles, data_time, source, kind, truncated),
+                        size=len(articles) * _RANKED_ENTRY_BYTES)
+    _snapshot_ids.set((id(articles), kind), (articles, snapshot_id), size=_RANKED_ENTRY_BYTES)
+    return snapshot_id
+
+def _encode_cursor(snapshot_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{snapshot_id}:{offset}".encode()).decode().rstrip('=')
+
+def _resolve_cursor(cursor: str, kind: str):
+    """
+    Look up the snapshot a cursor points to
+    
+    Args:
+        cursor: next_cursor from an earlier response
+        kind: Tool continuing the cursor ('latest' or 'hot')
+    
+    Returns:
+        (snapshot_id, articles, data_time, source, offset, truncated)
+    
+    Raises:
+        ValueError: if the cursor is malformed, its snapshot has expired or it
+                    was handed out by the other tool
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        snapshot_id, offset = decoded.split(':')
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    pinned = _snapshot_cache.get(snapshot_id)
+    if pinned is None or offset < 0:
+        raise ValueError("Cursor expired, start again without a cursor")
+    articles, data_time, source, pinned_kind, truncated = pinned
+    if pinned_kind != kind:
+        tool = 'get_hot_news' if pinned_kind == 'hot' else 'get_latest_news'
+        raise ValueError(f"Cursor belongs to {tool}, pass it back to that tool")
+    return snapshot_id, articles, data_time, source, offset, truncated
+
+def _get_hot_articles(source: str, timelimit: str):
+    """
+    Articles with a hotness score, hottest first (newest first among equal scores)
+    
+    Returns:
+        (articles, data_time, truncated)
+    """
+    cache_key = f"hot_{source}_{timelimit}"
+    cached = _news_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    return _query_flight.do(cache_key, _build_hot_articles, cache_key, source, timelimit)
 
-# Vietnamese news sources RSS feeds with priorities
-RSS_FEEDS = {
-    1: ("VnExpress", "https://vnexpress.net/rss/tin-moi-nhat.rss"),
-    2: ("Dân Trí", "https://dantri.com.vn/rss/tin-moi-nhat.rss"),
-}
+def _build_hot_articles(cache_key: str, source: str, timelimit: str):
+    articles, data_time = _get_base_articles(source, timelimit)
+    hot_news = [article for article in articles if article.hot_score > 0]
+    hot_news.sort(key=lambda a: -a.hot_score)
+    _news_cache.set(cache_key, (hot_news, data_time, articles.truncated))
+    return hot_news, data_time, articles.truncated
 
-def fetch_rss_feed(source_name: str, url: str, max_per_source: int = 10) -> List[Dict]:
-    """Fetch and parse RSS feed from a news source"""
-    try:
-        logger.info(f"  📡 Fetching from {source_name}...")
-        
-        # Fetch RSS with timeout
-        response = requests.get(url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-        
-        # Parse RSS feed
-        feed = feedparser.parse(response.content)
-        
-        articles = []
-        for entry in feed.entries[:max_per_source]:
-            # Parse publication date
-            article_time = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                article_time = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                article_time = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
-            elif hasattr(entry, 'published'):
-                try:
-                    parsed = parsedate_to_datetime(entry.published)
-                    # Ensure timezone aware
-                    if parsed.tzinfo is None:
-                        article_time = parsed.replace(tzinfo=timezone.utc)
-                    else:
-                        article_time = parsed
-                except:
-                    pass
-            
-            # Get description/summary
-            description = ""
-            if hasattr(entry, 'description'):
-                description = entry.description
-            elif hasattr(entry, 'summary'):
-                description = entry.summary
-            
-            # Clean HTML tags from description
-            import re
-            description = re.sub(r'<[^>]+>', '', description)
-            description = description.strip()[:300]
-            
-            article = {
-                "title": entry.title if hasattr(entry, 'title') else 'No title',
-                "url": entry.link if hasattr(entry, 'link') else '',
-                "source": source_name,
-                "date": entry.published if hasattr(entry, 'published') else '',
-                "excerpt": description,
-                "time": article_time
-            }
-            articles.append(article)
-        
-        logger.info(f"     ✓ Got {len(articles)} articles from {source_name}")
-        return articles
-        
-    except requests.exceptions.Timeout:
-        logger.warning(f"     ⚠️  Timeout fetching {source_name}")
-        return []
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"     ⚠️  Error fetching {source_name}: {str(e)[:100]}")
-        return []
-    except Exception as e:
-        logger.warning(f"     ⚠️  Parse error for {source_name}: {str(e)[:100]}")
-        return []
+def _snapshot_page(snapshot_id: Optional[str], all_articles: List[Article], data_time: Optional[datetime],
+                   source: str, offset: int, max_results: int, now: datetime,
+                   fields: Optional[Tuple[str, ...]] = None, excerpt_chars: Optional[int] = None,
+                   truncated: bool = False) -> Dict:
+    """One page of a ranked list, with a cursor for the next page when there is one"""
+    total_available = len(all_articles)
+    end_idx = offset + max_results
+    news_results = _paginate(all_articles, offset, max_results, fields, excerpt_chars)
+    
+    logger.info(f"📄 Pagination: Showing {len(news_results)} articles (offset: {offset}, total available: {total_available})")
+    
+    has_more = end_idx < total_available
+    next_cursor = None
+    if has_more:
+        next_cursor = _encode_cursor(snapshot_id or _pin_snapshot(all_articles, data_time, source, 'latest', truncated), end_idx)
+    stale_sources = _stale_feeds(_select_feeds(source))
+    
+    # Add metadata about available articles
+    return {
+        'articles': news_results,
+        'total_available': total_available,
+        'offset': offset,
+        'has_more': has_more,
+        'next_cursor': next_cursor,
+        'truncated': truncated,
+        'data_age_seconds': _data_age_seconds(data_time, now),
+        'stale': bool(stale_sources),
+        'stale_sources': stale_sources
+    }
+
+def _build_latest_news(cache_key: str, keywords: Optional[str], timelimit: str, source: str, sort: str):
+    """
+    Query layer miss: build and cache the ranked list for one set of parameters
+    
+    Returns:
+        (articles, cache_time, data_time, truncated)
+    """
+    current_time = datetime.now(timezone.utc)
+    logger.info(f"📰 Fetching news from Vietnamese RSS feeds...")
+    if keywords and timelimit in ('w', 'm') and _article_db is not None:
+        # Long-window keyword queries go straight to the FTS5 index
+        logger.info(f"🔎 Searching database for keywords: '{keywords}'")
+        feeds_to_fetch = _select_feeds(source)
+        data_time = _ensure_feeds_loaded(feeds_to_fetch)
+        cutoff_time = _get_cutoff_time(timelimit, current_time)
+        all_articles, truncated = _article_db.query([p for p, _ in feeds_to_fetch], cutoff_time, keywords, sort)
+        if truncated:
+            logger.warning(f"⚠️  Keyword matches capped at {_DB_MAX_ROWS} articles")
+        if len(feeds_to_fetch) > 1:
+            all_articles = _dedup_with_log(all_articles)
+        logger.info(f"🔍 After keyword filter: {len(all_articles)} articles")
+    else:
+        all_articles, data_time = _get_base_articles(source, timelimit)
+        truncated = all_articles.truncated
+    
+        # Filter by keywords if provided
+        if keywords:
+            logger.info(f"🔎 Filtering by keywords: '{keywords}'")
+            all_articles = _filter_by_keywords(all_articles, keywords, sort)
+            logger.info(f"🔍 After keyword filter: {len(all_articles)} articles")
+    
+    # Cache the full sorted articles list (before pagination)
+    _news_cache.set(cache_key, (all_articles, current_time, data_time, truncated))
+    logger.info(f"💾 Cached {len(all_articles)} articles for {_cache_ttl}s")
+    return all_articles, current_time, data_time, truncated
 
-def fetch_latest_news(keywords: Optional[str] = None, max_results: int = 5, timelimit: str = 'd', region: str = 'vn-vi', offset: int = 0, source: str = 'vnexpress'):
+def fetch_latest_news(keywords: Optional[str] = None, max_results: int = 5, timelimit: str = 'd', region: str = 'vn-vi', offset: int = 0, source: str = 'vnexpress', sort: str = 'date', cursor: Optional[str] = None,
+                      fields: Optional[Tuple[str, ...]] = None, excerpt_chars: Optional[int] = None):
     """
     Fetch latest news from Vietnamese news sources via RSS feeds
     
+    Results are built in layers: the fetched articles per (source, timelimit)
+    are cached once, and keyword filtering runs in memory on top of them.
+    
     Args:
         keywords: Keywords to filter news (optional - filters by title/content)
         max_results: Number of results to return
         timelimit: Time limit - 'd' (day), 'w' (week), 'm' (month)
         region: Not used (kept for API compatibility)
         offset: Number of articles to skip (for pagination)
-        source: Which source to fetch from - 'vnexpress', 'dantri', or 'all'
+        source: Which feeds to read - 'vnexpress', 'dantri', 'all', a category
+                ('the-thao') or 'source/category' (see _select_feeds)
+        sort: 'date' (newest first) or 'relevance' (best keyword match first)
+        cursor: next_cursor from a previous call; the page continues that call's
+                ranked snapshot and the other filter arguments and offset are ignored
+        fields: Article fields to return (default: all, see ARTICLE_FIELDS)
+        excerpt_chars: Shorten excerpts to about this many characters
     """
-    global _news_cache
+    current_time = datetime.now(timezone.utc)
+    if cursor:
+        snapshot_id, all_articles, data_time, source, offset, truncated = _resolve_cursor(cursor, 'latest')
+        logger.info(f"📌 Continuing snapshot {snapshot_id} at offset {offset}")
+        return _snapshot_page(snapshot_id, all_articles, data_time, source, offset, max_results, current_time,
+                              fields, excerpt_chars, truncated)
+    
+    # Treat empty string as None
+    if keywords is not None and keywords.strip() == '':
+        keywords = None
     
     # Create cache key based on parameters
     keywords_hash = hashlib.md5(str(keywords).encode()).hexdigest() if keywords else 'none'
-    cache_key = f"{source}_{timelimit}_{keywords_hash}"
-    current_time = datetime.now(timezone.utc)
-    
-    # Check cache first
-    if cache_key in _news_cache:
-        cached_articles, cache_time = _news_cache[cache_key]
-        if (current_time - cache_time).total_seconds() < _cache_ttl:
-            logger.info(f"📦 Using cached data (age: {int((current_time - cache_time).total_seconds())}s)")
-            # Apply pagination to cached data
-            total_available = len(cached_articles)
-            paginated_articles = cached_articles[offset:offset + max_results]
-            has_more = (offset + max_results) < total_available
-            
-            return {
-                'articles': paginated_articles,
-                'total_available': total_available,
-                'has_more': has_more
-            }
+    cache_key = f"{source}_{timelimit}_{keywords_hash}_{sort}"
     
     try:
-        logger.info(f"📰 Fetching news from Vietnamese RSS feeds...")
-        
-        # Treat empty string as None
-        if keywords is not None and keywords.strip() == '':
-            keywords = None
-        
-        if keywords:
-            logger.info(f"🔎 Filtering by keywords: '{keywords}'")
-        else:
-            logger.info(f"📰 Fetching latest news from all major Vietnamese sources")
-        
-        # Calculate cutoff time based on timelimit
-        now = datetime.now(timezone.utc)
-        if timelimit == 'd':
-            cutoff_time = now - timedelta(hours=24)
-        elif timelimit == 'w':
-            cutoff_time = now - timedelta(weeks=1)
-        elif timelimit == 'm':
-            cutoff_time = now - timedelta(days=30)
+        # Query layer: the filtered list for these exact parameters (expires after _cache_ttl)
+        cached = _news_cache.get(cache_key)
+        if cached is not None:
+            all_articles, cache_time, data_time, truncated = cached
+            logger.info(f"📦 Using cached data (age: {int((current_time - cache_time).total_seconds())}s)")
         else:
-            cutoff_time = now - timedelta(hours=24)
-        
-        logger.info(f"⏰ Filtering articles after: {cutoff_time.strftime('%Y-%m-%d %H:%M')}")
-        
-        # Filter RSS feeds by source parameter
-        all_articles = []
-        feeds_to_fetch = RSS_FEEDS.items()
-        
-        if source == 'vnexpress':
-            feeds_to_fetch = [(p, (n, u)) for p, (n, u) in RSS_FEEDS.items() if 'vnexpress' in n.lower()]
-        elif source == 'dantri':
-            feeds_to_fetch = [(p, (n, u)) for p, (n, u) in RSS_FEEDS.items() if 'dân trí' in n.lower()]
-        # else source == 'all': fetch from all feeds
-        
-        for priority, (source_name, rss_url) in feeds_to_fetch:
-            articles = fetch_rss_feed(source_name, rss_url, max_per_source=30)
-            for article in articles:
-                article['priority'] = priority
-            all_articles.extend(articles)
-        
-        logger.info(f"📊 Total fetched: {len(all_articles)} articles from {len(RSS_FEEDS)} sources")
-        
-        # Filter by keywords if provided
-        if keywords:
-            keywords_lower = keywords.lower()
-            filtered_articles = []
-            for article in all_articles:
-                title_lower = article.get('title', '').lower()
-                excerpt_lower = article.get('excerpt', '').lower()
-                if keywords_lower in title_lower or keywords_lower in excerpt_lower:
-                    filtered_articles.append(article)
-            all_articles = filtered_articles
-            logger.info(f"🔍 After keyword filter: {len(all_articles)} articles")
+            # Concurrent misses for the same parameters share one build
+            all_articles, cache_time, data_time, truncated = _query_flight.do(
+                cache_key, _build_latest_news, cache_key, keywords, timelimit, source, sort)
         
-        # Filter by time
-        filtered_count = 0
-        time_filtered_articles = []
-        for article in all_articles:
-            article_time = article.get('time')
-            if article_time and article_time < cutoff_time:
-                filtered_count += 1
-                continue
-            time_filtered_articles.append(article)
-        
-        all_articles = time_filtered_articles
-        
-        if filtered_count > 0:
-            logger.info(f"🗑️  Filtered out {filtered_count} old articles")
-        
-        # Sort by: 1) Date (descending - newest first), 2) Source priority (ascending)
-        all_articles.sort(key=lambda x: (
-            -(x.get('time') or datetime.min.replace(tzinfo=timezone.utc)).timestamp(),
-            x.get('priority', 999)
-        ))
-        
-        # Apply pagination
-        total_available = len(all_articles)
-        start_idx = offset
-        end_idx = offset + max_results
-        paginated_articles = all_articles[start_idx:end_idx]
-        
-        logger.info(f"📄 Pagination: Showing {len(paginated_articles)} articles (offset: {offset}, total available: {total_available})")
-        
-        # Take only max_results
-        news_results = []
-        for idx, article in enumerate(paginated_articles, start=offset+1):
-            article["rank"] = idx
-            title = article["title"]
-            source = article["source"]
-            date = article.get("date", '')
-            priority = article.get("priority", 999)
-            
-            # Log with priority indicator
-            priority_label = f"P{priority}" if priority <= 8 else "Other"
-            logger.info(f"  ✓ [{idx}] {title[:60]}...")
-            logger.info(f"       Source: {source} ({priority_label}) | Date: {date[:10] if date else 'N/A'}")
-            
-            # Remove 'time' and 'priority' fields before returning
-            if 'time' in article:
-                del article["time"]
-            if 'priority' in article:
-                del article["priority"]
-            news_results.append(article)
-        
-        if filtered_count > 0:
-            logger.info(f"🗑️  Filtered out {filtered_count} old articles")
-        
-        logger.info(f"✅ Parsed {len(news_results)} news articles successfully")
-        
-        # Cache the full sorted articles list (before pagination)
-        _news_cache[cache_key] = (all_articles, current_time)
-        logger.info(f"💾 Cached {len(all_articles)} articles for {_cache_ttl}s")
-        
-        # Add metadata about available articles
-        return {
-            'articles': news_results,
-            'total_available': total_available,
-            'offset': offset,
-            'has_more': end_idx < total_available
-        }
+        return _snapshot_page(None, all_articles, data_time, source, offset, max_results, current_time,
+                              fields, excerpt_chars, truncated)
         
     except Exception as e:
         logger.error(f"❌ Error fetching news: {e}")
@@ -272,63 +2546,31 @@ def fetch_latest_news(keywords: Optional[str] = None, max_results: int = 5, time
         logger.error(f"Stack trace: {traceback.format_exc()}")
         raise
 
-@mcp.tool()
-def get_latest_news(
+async def _load_feeds_for_tool(source: Optional[str]):
+    """Cold-start the feeds a tool call reads without blocking the event loop"""
+    if source is None:
+        # Cursor pages read a pinned snapshot
+        return
+    try:
+        await _ensure_feeds_loaded_async(_select_feeds(source))
+    except Exception as e:
+        # The blocking path retries the fetch in its worker thread
+        logger.warning(f"⚠️  Async feed loading failed: {e}")
+
+def _get_latest_news_sync(
     keywords: Optional[str] = None,
     max_results: int = 3,
     timelimit: str = 'd',
     region: str = 'vn-vi',
     offset: int = 0,
-    source: str = 'vnexpress'
+    source: str = 'vnexpress',
+    sort: str = 'date',
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    excerpt_length: Optional[int] = None
 ) -> dict:
-    """
-    Get latest news articles from Vietnamese news sources via RSS feeds.
-    Returns 3 articles by default (client reading capacity).
-    
-    Available sources:
-    - VnExpress (vnexpress.net) - Default
-    - Dân Trí (dantri.com.vn) - On request
-    
-    Args:
-        keywords: Keywords to filter news by title/content (optional).
-                 If None/empty: Returns all latest news from Vietnamese sources
-                 Examples: "công nghệ", "thể thao", "kinh tế", "covid", "bóng đá"
-        max_results: Number of news articles to return (default: 3, max: 50)
-        timelimit: Time range for news:
-                  'd' = last 24 hours (default)
-                  'w' = last week
-                  'm' = last month
-        region: Not used (kept for API compatibility)
-        offset: Number of articles to skip for pagination (default: 0)
-                Use this to get more articles: offset=0 gets first 3,
-                offset=3 gets next 3, offset=6 gets next 3, etc.
-        source: Which news source to fetch from (default: 'vnexpress')
-                Options: 'vnexpress', 'dantri', 'all'
-    
-    Returns:
-        dict with success status, articles, and pagination info
-        
-    Example response:
-        {
-            "success": true,
-            "query": "Latest Vietnamese News",
-            "total_results": 5,
-            "total_available": 25,
-            "offset": 0,
-            "has_more": true,
-            "timelimit": "d",
-            "articles": [
-                {
-                    "rank": 1,
-                    "title": "Breaking news headline...",
-                    "source": "VnExpress",
-                    "date": "Thu, 25 Dec 2025 21:24:28 +0700",
-                    "url": "https://vnexpress.net/...",
-                    "excerpt": "Article excerpt..."
-                }
-            ]
-        }
-    """
+    """Blocking implementation of get_latest_news (the tool runs it in a worker thread)"""
     try:
         logger.info('='*60)
         logger.info(f"📰 NEW NEWS REQUEST RECEIVED")
@@ -337,7 +2579,7 @@ def get_latest_news(
         if keywords is not None and keywords.strip() == '':
             keywords = None
         
-        source_label = "VnExpress only" if source == 'vnexpress' else ("Dân Trí only" if source == 'dantri' else "all sources")
+        source_label = _source_label(source)
         if keywords is None:
             logger.info(f"📰 Mode: Latest Vietnamese News ({source_label})")
             query_display = "Latest Vietnamese News"
@@ -359,27 +2601,33 @@ def get_latest_news(
             logger.warning(f"Invalid timelimit '{timelimit}', using 'd' (day)")
             timelimit = 'd'
         
+        if sort not in ['date', 'relevance']:
+            logger.warning(f"Invalid sort '{sort}', using 'date'")
+            sort = 'date'
+        
         logger.info(f"⏳ Fetching latest news...")
         
         # Fetch news with pagination
-        result_data = fetch_latest_news(keywords, max_results, timelimit, region, offset, source)
+        article_fields = parse_fields(fields, compact)
+        excerpt_chars = max(0, excerpt_length) if excerpt_length is not None else None
+        result_data = fetch_latest_news(keywords, max_results, timelimit, region, offset, source, sort, cursor,
+                                        article_fields, excerpt_chars)
         news_articles = result_data['articles']
         total_available = result_data['total_available']
         has_more = result_data['has_more']
+        offset = result_data['offset']
         
         logger.info(f"✅ News fetch completed successfully!")
         logger.info(f"Found {len(news_articles)} news articles (total available: {total_available})")
         
-        # Log first article as sample
-        if news_articles:
-            logger.info(f"Top article: {news_articles[0]['title'][:60]}...")
-            logger.info(f"Source: {news_articles[0]['source']}")
-        
         if has_more:
-            logger.info(f"💡 More articles available. Use offset={offset + max_results} to see more.")
+            logger.info(f"💡 More articles available. Use offset={offset + max_results} or next_cursor to see more.")
         
         logger.info('='*60)
         
+        if compact:
+            return compact_response(news_articles, has_more, result_data['next_cursor'], result_data['stale'])
+        
         result = {
             "success": True,
             "query": query_display,
@@ -387,7 +2635,12 @@ def get_latest_news(
             "total_available": total_available,
             "offset": offset,
             "has_more": has_more,
+            "next_cursor": result_data['next_cursor'],
+            "truncated": result_data['truncated'],
             "timelimit": timelimit,
+            "data_age_seconds": result_data.get('data_age_seconds'),
+            "stale": result_data['stale'],
+            "stale_sources": result_data['stale_sources'],
             "articles": news_articles
         }
         
@@ -412,39 +2665,111 @@ def get_latest_news(
         }
 
 @mcp.tool()
-def get_hot_news(
+async def get_latest_news(
+    keywords: Optional[str] = None,
     max_results: int = 3,
     timelimit: str = 'd',
+    region: str = 'vn-vi',
     offset: int = 0,
-    source: str = 'vnexpress'
+    source: str = 'vnexpress',
+    sort: str = 'date',
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    excerpt_length: Optional[int] = None
 ) -> dict:
     """
-    Get HOT/BREAKING news from Vietnamese sources.
-    Returns 3 hot articles by default (client reading capacity).
-    Filters for urgent, important, or trending news based on keywords.
+    Get latest news articles from Vietnamese news sources via RSS feeds.
+    Returns 3 articles by default (client reading capacity).
     
-    Hot news indicators include:
-    - Khẩn cấp, nóng, nổi bật, đột phá, chấn động
-    - Breaking, urgent, exclusive
-    - Tin nhanh, tin mới, vừa xảy ra
+    Available sources:
+    - VnExpress (vnexpress.net) - Default
+    - Dân Trí (dantri.com.vn) - On request
     
     Args:
-        max_results: Number of hot news to return (default: 3, max: 50)
-        timelimit: Time range:
+        keywords: Keywords to filter news by title/content (optional).
+                 If None/empty: Returns all latest news from Vietnamese sources
+                 Examples: "công nghệ", "thể thao", "kinh tế", "covid", "bóng đá"
+                 Accents are optional ("bong da" matches "bóng đá"). All words
+                 must match; use "OR" between alternatives: "bóng đá OR thể thao"
+        max_results: Number of news articles to return (default: 3, max: 50)
+        timelimit: Time range for news:
                   'd' = last 24 hours (default)
                   'w' = last week
                   'm' = last month
+        region: Not used (kept for API compatibility)
         offset: Number of articles to skip for pagination (default: 0)
-                Use this to get more hot news: offset=0 gets first 3,
+                Use this to get more articles: offset=0 gets first 3,
                 offset=3 gets next 3, offset=6 gets next 3, etc.
+        source: Which news source to fetch from (default: 'vnexpress')
+                Options: 'vnexpress', 'dantri', 'all', a category such as
+                'the-thao' or 'kinh-doanh' (all sources), or both: 'dantri/the-thao'
+        sort: Order of keyword results (default: 'date')
+              'date' = newest first, 'relevance' = best match first
+        cursor: Pass "next_cursor" from the previous response to get the next page
+                of the same result list, even if new articles arrived meanwhile.
+                When set, the other filters and offset are taken from the cursor.
+        fields: Comma-separated article fields to return, e.g. "title" or
+                "title,url" (from rank, title, url, source, date, excerpt).
+                Default: all fields (only "title" in compact mode).
+        compact: Return only articles, has_more and next_cursor - for small
+                 devices that just read the titles (default: False)
+        excerpt_length: Shorten excerpts to about this many characters
+                        (default: full excerpt, up to 300 characters)
     
     Returns:
-        dict with hot news articles sorted by hotness score and pagination info
+        dict with success status, articles, and pagination info.
+        "stale" is true when some feeds could not be refreshed recently; their
+        last good articles are still included and "stale_sources" lists them.
+        "truncated" is true when a week/month window matched more articles than
+        are served (2000); narrow the source or time range to see the rest.
+        
+    Example response:
+        {
+            "success": true,
+            "query": "Latest Vietnamese News",
+            "total_results": 5,
+            "total_available": 25,
+            "offset": 0,
+            "has_more": true,
+            "next_cursor": "MWY0YzhlOWEyYjNjNGQ1ZTZmOjU",
+            "truncated": false,
+            "timelimit": "d",
+            "data_age_seconds": 12,
+            "stale": false,
+            "stale_sources": [],
+            "articles": [
+                {
+                    "rank": 1,
+                    "title": "Breaking news headline...",
+                    "source": "VnExpress",
+                    "date": "Thu, 25 Dec 2025 21:24:28 +0700",
+                    "url": "https://vnexpress.net/...",
+                    "excerpt": "Article excerpt..."
+                }
+            ]
+        }
     """
+    # Cold-start fetches are async; the rest is in-memory work
+    await _load_feeds_for_tool(None if cursor else source)
+    return await asyncio.to_thread(_get_latest_news_sync, keywords, max_results, timelimit, region, offset, source, sort, cursor,
+                                   fields, compact, excerpt_length)
+
+def _get_hot_news_sync(
+    max_results: int = 3,
+    timelimit: str = 'd',
+    offset: int = 0,
+    source: str = 'vnexpress',
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    excerpt_length: Optional[int] = None
+) -> dict:
+    """Blocking implementation of get_hot_news (the tool runs it in a worker thread)"""
     try:
         logger.info('='*60)
         logger.info(f"🔥 HOT NEWS REQUEST RECEIVED")
-        source_label = "VnExpress only" if source == 'vnexpress' else ("Dân Trí only" if source == 'dantri' else "all sources")
+        source_label = _source_label(source)
         logger.info(f"🔥 Source: {source_label}")
         logger.info(f"Max results: {max_results}")
         logger.info(f"Time limit: {timelimit}")
@@ -458,87 +2783,45 @@ def get_hot_news(
         
         logger.info(f"🔥 Fetching and analyzing news for hot topics...")
         
-        # Fetch ALL available articles to analyze (not just 30)
-        # This ensures consistent hot news ranking across pagination
-        result_data = fetch_latest_news(keywords=None, max_results=50, timelimit=timelimit, offset=0, source=source)
-        all_articles = result_data['articles']
-        
-        logger.info(f"📊 Analyzing {len(all_articles)} articles for hot indicators...")
-        
-        # Hot keywords (higher score = hotter)
-        # Expanded list to catch more hot news
-        hot_indicators = {
-            'khẩn cấp': 10, 'nóng': 8, 'đột phá': 7, 'chấn động': 7,
-            'nổi bật': 6, 'bất ngờ': 6, 'sốc': 7, 'lần đầu': 5,
-            'breaking': 10, 'urgent': 9, 'exclusive': 7,
-            'vừa xảy ra': 8, 'mới xảy ra': 8, 'tin nhanh': 6,
-            'đặc biệt': 5, 'quan trọng': 4, 'nghiêm trọng': 7,
-            'khẩn': 8, 'nhanh': 3, 'mới': 2, 'hot': 6,
-            'cháy': 9, 'nổ': 8, 'tai nạn': 6, 'thiệt hại': 5,
-            'bắt giữ': 6, 'khởi tố': 6, 'điều tra': 4,
-            'biểu tình': 7, 'đình công': 7, 'xung đột': 8,
-            'từ chức': 6, 'từ nhiệm': 6, 'bổ nhiệm': 4, 'qua đời': 5,
-            'tử vong': 6, 'tử nạn': 7, 'thiệt mạng': 7,
-            'tăng đột biến': 6, 'giảm mạnh': 6, 'kỷ lục': 7,
-            'nghiêm cấm': 5, 'cấm': 4, 'truy tố': 5,
-            'ùn tắc': 4, 'tê liệt': 5, 'gián đoạn': 4,
-            'đề xuất': 3, 'kiến nghị': 3, 'yêu cầu': 2,
-            'mạnh': 3, 'lớn': 2, 'nghiêm': 4,
-        }
-        
-        # Score each article
-        hot_news = []
-        for article in all_articles:
-            title = article.get('title', '').lower()
-            excerpt = article.get('excerpt', '').lower()
-            
-            # Calculate hotness score
-            score = 0
-            matched_keywords = []
-            
-            for keyword, points in hot_indicators.items():
-                if keyword in title:
-                    score += points * 2  # Title matches worth double
-                    matched_keywords.append(keyword)
-                elif keyword in excerpt:
-                    score += points
-                    matched_keywords.append(keyword)
-            
-            if score > 0:
-                article['hotness_score'] = score
-                article['hot_keywords'] = matched_keywords
-                hot_news.append(article)
-                logger.info(f"  🔥 Hot: {article['title'][:50]}... (score: {score})")
-        
-        # Sort by hotness score (highest first)
-        hot_news.sort(key=lambda x: x.get('hotness_score', 0), reverse=True)
+        # Hotness is scored once per article at ingest, so ranking is just a sort.
+        # The ranked list is cached, and cursors pin it so later pages are a slice.
+        if cursor:
+            snapshot_id, hot_news, data_time, source, offset, truncated = _resolve_cursor(cursor, 'hot')
+            logger.info(f"📌 Continuing snapshot {snapshot_id} at offset {offset}")
+        else:
+            snapshot_id = None
+            hot_news, data_time, truncated = _get_hot_articles(source, timelimit)
         
         logger.info(f"📊 Total hot news found: {len(hot_news)}")
         
         # Apply pagination
         total_hot_available = len(hot_news)
-        start_idx = offset
         end_idx = offset + max_results
-        paginated_hot_news = hot_news[start_idx:end_idx]
+        article_fields = parse_fields(fields, compact)
+        excerpt_chars = max(0, excerpt_length) if excerpt_length is not None else None
+        paginated_hot_news = [article_view(article, idx, article_fields, excerpt_chars) for idx, article in
+                              enumerate(hot_news[offset:end_idx], start=offset+1)]
+        for article in hot_news[offset:end_idx]:
+            logger.info(f"  🔥 Hot: {article.title[:50]}... (score: {article.hot_score}, {', '.join(article.hot_keywords)})")
         
         logger.info(f"📄 Hot news pagination: Showing {len(paginated_hot_news)} articles (offset: {offset}, total hot: {total_hot_available})")
         
-        # Re-rank and clean up
-        for idx, article in enumerate(paginated_hot_news, start=offset+1):
-            article['rank'] = idx
-            # Remove internal scoring fields
-            article.pop('hotness_score', None)
-            article.pop('hot_keywords', None)
-        
         has_more = end_idx < total_hot_available
+        next_cursor = None
+        if has_more:
+            next_cursor = _encode_cursor(snapshot_id or _pin_snapshot(hot_news, data_time, source, 'hot', truncated), end_idx)
+        stale_sources = _stale_feeds(_select_feeds(source))
         
         logger.info(f"✅ Returning {len(paginated_hot_news)} hot news articles")
         
         if has_more:
-            logger.info(f"💡 More hot news available. Use offset={offset + max_results} to see more.")
+            logger.info(f"💡 More hot news available. Use offset={offset + max_results} or next_cursor to see more.")
         
         logger.info('='*60)
         
+        if compact:
+            return compact_response(paginated_hot_news, has_more, next_cursor, bool(stale_sources))
+        
         return {
             "success": True,
             "query": "Hot News",
@@ -546,7 +2829,12 @@ def get_hot_news(
             "total_hot_found": total_hot_available,
             "offset": offset,
             "has_more": has_more,
+            "next_cursor": next_cursor,
+            "truncated": truncated,
             "timelimit": timelimit,
+            "data_age_seconds": _data_age_seconds(data_time, datetime.now(timezone.utc)),
+            "stale": bool(stale_sources),
+            "stale_sources": stale_sources,
             "articles": paginated_hot_news
         }
         
@@ -562,12 +2850,123 @@ def get_hot_news(
             "articles": []
         }
 
+@mcp.tool()
+async def get_hot_news(
+    max_results: int = 3,
+    timelimit: str = 'd',
+    offset: int = 0,
+    source: str = 'vnexpress',
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    compact: bool = False,
+    excerpt_length: Optional[int] = None
+) -> dict:
+    """
+    Get HOT/BREAKING news from Vietnamese sources.
+    Returns 3 hot articles by default (client reading capacity).
+    Filters for urgent, important, or trending news based on keywords.
+    
+    Hot news indicators include:
+    - Khẩn cấp, nóng, nổi bật, đột phá, chấn động
+    - Breaking, urgent, exclusive
+    - Tin nhanh, tin mới, vừa xảy ra
+    
+    Args:
+        max_results: Number of hot news to return (default: 3, max: 50)
+        timelimit: Time range:
+                  'd' = last 24 hours (default)
+                  'w' = last week
+                  'm' = last month
+        offset: Number of articles to skip for pagination (default: 0)
+                Use this to get more hot news: offset=0 gets first 3,
+                offset=3 gets next 3, offset=6 gets next 3, etc.
+        source: Which news source to use (default: 'vnexpress')
+                Options: 'vnexpress', 'dantri', 'all', a category such as
+                'the-thao', or both: 'dantri/the-thao'
+        cursor: Pass "next_cursor" from the previous response to get the next page
+                of the same hot list; timelimit, source and offset are then ignored
+        fields, compact, excerpt_length: Response shaping, as in get_latest_news
+    
+    Returns:
+        dict with hot news articles sorted by hotness score and pagination info,
+        plus "stale"/"stale_sources" and "truncated" as in get_latest_news
+    """
+    # Cold-start fetches are async; the rest is in-memory work
+    await _load_feeds_for_tool(None if cursor else source)
+    return await asyncio.to_thread(_get_hot_news_sync, max_results, timelimit, offset, source, cursor,
+                                   fields, compact, excerpt_length)
+
+def _get_trending_topics_sync(max_results: int = 10) -> dict:
+    """Blocking implementation of get_trending_topics (the tool runs it in a worker thread)"""
+    try:
+        logger.info('='*60)
+        logger.info(f"📈 TRENDING TOPICS REQUEST RECEIVED")
+        logger.info(f"Max results: {max_results}")
+        
+        max_results = min(max(1, max_results), 50)
+        
+        # Terms are counted as articles are ingested; this only makes sure
+        # the feeds were loaded once
+        data_time = _ensure_feeds_loaded(_select_feeds('all'))
+        topics = _trend_detector.trending(max_results)
+        for idx, topic in enumerate(topics, start=1):
+            topic['rank'] = idx
+            logger.info(f"  📈 [{idx}] {topic['term']} (score: {topic['score']}, recent: {topic['recent_mentions']})")
+        
+        logger.info(f"✅ Returning {len(topics)} trending topics")
+        logger.info('='*60)
+        
+        return {
+            "success": True,
+            "query": "Trending Topics",
+            "total_results": len(topics),
+            "window_hours": round(_TREND_SHORT_HALF_LIFE / 3600, 1),
+            "baseline_hours": round(_TREND_LONG_HALF_LIFE / 3600, 1),
+            "data_age_seconds": _data_age_seconds(data_time, datetime.now(timezone.utc)),
+            "topics": topics
+        }
+        
+    except Exception as e:
+        error_msg = f"Error detecting trending topics: {e}"
+        logger.error('='*60)
+        logger.error(f"❌ TRENDING TOPICS FAILED")
+        logger.error(f"Error: {error_msg}")
+        logger.error('='*60)
+        return {
+            "success": False,
+            "error": error_msg,
+            "topics": []
+        }
+
+@mcp.tool()
+async def get_trending_topics(max_results: int = 10) -> dict:
+    """
+    Get topics that are trending right now across all Vietnamese news feeds.
+    
+    A topic trends when it appears in clearly more headlines in the last hour
+    or so than its usual rate over the last day predicts (a burst), so
+    everyday words do not show up even if they are frequent.
+    
+    Args:
+        max_results: Number of topics to return (default: 10, max: 50)
+    
+    Returns:
+        dict with trending topics, strongest burst first. Each topic has:
+        term, kind ('entity' for names like "Hà Nội", 'phrase' otherwise),
+        score (burst strength), recent_mentions, baseline_per_hour and
+        example_titles (latest headlines mentioning it).
+    """
+    # Cold-start fetches are async; the rest is in-memory work
+    await _load_feeds_for_tool('all')
+    return await asyncio.to_thread(_get_trending_topics_sync, max_results)
+
 # Start the server
 if __name__ == "__main__":
     logger.info("🚀 Starting MCP server with stdio transport...")
     logger.info("📡 Server is ready to receive requests from MCP clients")
-    logger.info("💡 Available tools: get_latest_news, get_hot_news")
+    logger.info("💡 Available tools: get_latest_news, get_hot_news, get_trending_topics")
     logger.info("Waiting for requests...\n")
+    start_background_refresh()
     try:
         mcp.run(transport="stdio")
     except KeyboardInterrupt:
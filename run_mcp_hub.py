@@ -23,8 +23,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 logger.info("Loading MCP servers...")
 from calculator import mcp as calculator_mcp
-from news_service import mcp as news_mcp
-from google_search import mcp as search_mcp
+from news_service import mcp as news_mcp, get_news_stats, start_background_refresh, stop_background_refresh, close_async_client
+from google_search import mcp as search_mcp, get_search_stats, warm_search_clients
 
 MCP_SERVERS = {
     "calculator": calculator_mcp,
@@ -43,6 +43,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_feed_refresher():
+    """Keep news feeds warm in the background so news tools answer from memory"""
+    start_background_refresh()
+
+@app.on_event("startup")
+async def start_search_clients():
+    """Create the pooled search clients before the first search arrives"""
+    await asyncio.to_thread(warm_search_clients)
+
+@app.on_event("shutdown")
+async def stop_feed_refresher():
+    """Stop the feed refresher and close pooled feed connections"""
+    stop_background_refresh()
+    await close_async_client()
+
 @app.get("/")
 async def root():
     """Status and available servers"""
@@ -60,6 +76,14 @@ async def health():
     """Health check for Render"""
     return {"status": "healthy"}
 
+@app.get("/stats")
+async def stats():
+    """Runtime counters (connection reuse, caches) for tuning"""
+    return {
+        "news_service": get_news_stats(),
+        "google_search": get_search_stats(),
+    }
+
 # Mount each MCP server's SSE endpoint
 for name, mcp_server in MCP_SERVERS.items():
     # Get the FastAPI app from the MCP server with SSE transport
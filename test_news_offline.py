@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the news service's in-memory structures
+Uses synthetic Article records, so no feeds or network access are needed
+"""
+
+import os
+
+# Keep the article database out of the way: everything here is in memory
+os.environ.setdefault('NEWS_DB_PATH', '')
+
+import logging
+import news_service as news
+from news_service import make_article
+
+# Only show warnings from the news service
+logging.getLogger('NewsService').setLevel(logging.WARNING)
+
+def test_keyword_index():
+    """Accent-insensitive AND/OR matching, BM25 ranking and reference counting"""
+    index = news.ArticleIndex()
+    index.add("a", "Bóng đá Việt Nam thắng Lào", "Trận đấu bóng đá tối qua")
+    index.add("b", "Giá vàng tăng mạnh", "Thị trường vàng sôi động, bóng đá chỉ là chuyện nhỏ")
+    index.add("c", "Thời tiết Hà Nội", "Mưa lớn kéo dài")
+    
+    results = index.search("bong da")
+    print(f"'bong da' -> {results}")
+    assert set(results) == {"a", "b"}
+    # Title words weigh more, so the football article ranks first
+    assert results["a"] > results["b"]
+    
+    assert set(index.search("bóng đá lào")) == {"a"}
+    assert set(index.search("vàng OR thời tiết")) == {"b", "c"}
+    assert set(index.search("vang | mua")) == {"b", "c"}
+    assert index.search("không có") == {}
+    
+    # Listed by a second feed: stays indexed until both feeds drop it
+    index.add("a", "Bóng đá Việt Nam thắng Lào", "Trận đấu bóng đá tối qua")
+    index.remove("a")
+    assert "a" in index.search("lao")
+    index.remove("a")
+    assert index.search("lao") == {}
+    assert index.stats()["articles"] == 2
+
+def test_dedup_clusters():
+    """URL and near-duplicate clustering across sources, and a bounded rolling window"""
+    dedup = news.DedupIndex()
+    original = make_article("Giá vàng hôm nay tăng mạnh lên mức kỷ lục mới", "https://a.vn/1",
+                            "VnExpress", "", "Giá vàng miếng SJC sáng nay tăng thêm 500 nghìn đồng mỗi lượng", 1.0, 1)
+    syndicated = make_article("Giá vàng hôm nay tăng mạnh lên mức kỷ lục", "https://b.vn/9",
+                              "Dân Trí", "", "Giá vàng miếng SJC sáng nay tăng thêm 500 nghìn đồng mỗi lượng", 1.0, 2)
+    same_url = make_article("Tiêu đề khác hẳn", "https://www.a.vn/1?utm_source=fb", "Dân Trí", "", "x", 1.0, 2)
+    unrelated = make_article("Đội tuyển Việt Nam thắng đậm Lào", "https://b.vn/10", "Dân Trí", "",
+                             "Trận đấu diễn ra tối qua trên sân Mỹ Đình", 1.0, 2)
+    
+    cluster = dedup.add(original)
+    assert dedup.add(syndicated) == cluster
+    assert dedup.add(same_url) == cluster
+    assert dedup.add(unrelated) != cluster
+    stats = dedup.stats()
+    print(f"Dedup: {stats}")
+    assert stats["url_duplicates"] == 1 and stats["near_duplicates"] == 1
+    
+    # Merged results keep only the first article of each cluster
+    shared_index, news._dedup_index = news._dedup_index, dedup
+    try:
+        assert news._dedup_articles([original, syndicated, unrelated]) == [original, unrelated]
+    finally:
+        news._dedup_index = shared_index
+    
+    # Everything, URLs included, leaves with the oldest articles
+    window = news.DedupIndex(window=50)
+    for idx in range(2000):
+        source = "A" if idx % 2 else "B"
+        window.add(make_article(f"Giá vàng hôm nay tăng mạnh lên mức kỷ lục mới phiên {idx // 2}",
+                                f"https://{source}.vn/{idx}", source, "",
+                                "Giá vàng miếng SJC sáng nay tăng thêm 500 nghìn đồng mỗi lượng", 1.0, 1))
+    stats = window.stats()
+    print(f"Window after 2000 adds: {stats}")
+    assert stats["window"] == 50 and stats["urls"] <= 50
+
+def _ranked_list(prefix: str, count: int):
+    return [make_article(f"{prefix} tin {idx}", f"https://{prefix}.vn/{idx}", prefix, "", "", 1000.0 - idx, 1)
+            for idx in range(count)]
+
+def test_cursor_pages():
+    """Cursor pages continue one snapshot; expired or forged cursors are refused"""
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc)
+    articles = _ranked_list("x", 12)
+    
+    first = news._snapshot_page(None, articles, now, "all", 0, 5, now)
+    assert first["has_more"] and first["next_cursor"]
+    # Calls served from the same ranked list share one snapshot
+    again = news._snapshot_page(None, articles, now, "all", 0, 5, now)
+    assert again["next_cursor"] == first["next_cursor"]
+    
+    titles = [item["title"] for item in first["articles"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = news.fetch_latest_news(max_results=5, cursor=cursor)
+        titles.extend(item["title"] for item in page["articles"])
+        cursor = page["next_cursor"]
+    print(f"Paged through {len(titles)} articles")
+    assert titles == [article.title for article in articles]
+    
+    # Once a snapshot is gone its cursor must not resolve to a newer list
+    for idx in range(50):
+        old_items = tuple(_ranked_list(f"old{idx}", 6))
+        new_items = tuple(_ranked_list(f"new{idx}", 6))
+        ranked = list(old_items)
+        stale = news._snapshot_page(None, ranked, now, "all", 0, 5, now)["next_cursor"]
+        news._snapshot_cache.clear()
+        news._snapshot_ids.clear()
+        # The freed list's address is usually handed straight to the next one
+        del ranked
+        ranked = list(new_items)
+        news._snapshot_page(None, ranked, now, "all", 0, 5, now)
+        try:
+            news._resolve_cursor(stale, 'latest')
+            assert False, "expired cursor resolved"
+        except ValueError as e:
+            assert "expired" in str(e)
+        del ranked
+    
+    # A latest-news cursor is not a hot-news cursor, and the other way round
+    hot = _ranked_list("hot", 12)
+    hot_cursor = news._encode_cursor(news._pin_snapshot(hot, now, "all", 'hot'), 5)
+    latest_cursor = news._snapshot_page(None, articles, now, "all", 0, 5, now)["next_cursor"]
+    assert news._resolve_cursor(hot_cursor, 'hot')[1] is hot
+    for cursor, kind in ((latest_cursor, 'hot'), (hot_cursor, 'latest')):
+        try:
+            news._resolve_cursor(cursor, kind)
+            assert False, f"{kind} tool accepted the other tool's cursor"
+        except ValueError as e:
+            assert "belongs to" in str(e)
+    page = news._get_hot_news_sync(cursor=latest_cursor)
+    assert not page["success"] and "get_latest_news" in page["error"]
+    
+    for bad in ("not-a-cursor", "!!!", news._encode_cursor("missing", 5)):
+        try:
+            news._resolve_cursor(bad, 'latest')
+            assert False, f"bad cursor {bad!r} resolved"
+        except ValueError:
+            pass
+
+def test_circuit_breaker():
+    """Failures open the breaker; one half-open probe decides whether it closes"""
+    import time
+    breaker = news.CircuitBreaker(failure_threshold=3, open_seconds=0.2, max_open_seconds=0.3, negative_ttl=0.05)
+    
+    assert breaker.allow()
+    breaker.record_failure("timeout")
+    # A single failure only blocks retries for the negative cache TTL
+    assert breaker.state == 'closed' and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure("timeout")
+    time.sleep(0.06)
+    breaker.record_failure("timeout")
+    assert breaker.state == 'open' and not breaker.allow()
+    
+    time.sleep(0.21)
+    assert breaker.allow() and breaker.state == 'half_open'
+    assert not breaker.allow(), "second probe let through"
+    breaker.record_failure("HTTP 503")
+    # A failed probe doubles the open period, capped at max_open_seconds
+    assert breaker.state == 'open' and breaker.stats()["retry_in_seconds"] > 0.2
+    time.sleep(0.31)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    
+    stats = breaker.stats()
+    print(f"Breaker stats: {stats}")
+    assert breaker.healthy and stats["consecutive_failures"] == 0 and stats["opened"] == 2
+    assert breaker.allow() and breaker.allow()
+
+def test_article_db_feeds():
+    """An article listed by two feeds stays in both feeds' windows and warm starts"""
+    import tempfile
+    from datetime import datetime, timedelta, timezone
+    now = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = news.ArticleDB(os.path.join(tmp, "articles.db"))
+        shared = make_article("Giá vàng tăng", "https://a.vn/shared", "VnExpress", "", "", now.timestamp() - 60, 1)
+        only_one = make_article("Bão số 3", "https://a.vn/one", "VnExpress", "", "", now.timestamp() - 120, 1)
+        db.upsert([shared, only_one])
+        # The category feed lists the same URL and is fetched last
+        db.upsert([shared._replace(priority=3)])
+        
+        since = now - timedelta(days=7)
+        assert [a.url for a in db.query([1], since)[0]] == [shared.url, only_one.url]
+        assert [(a.url, a.priority) for a in db.query([3], since)[0]] == [(shared.url, 3)]
+        # Across both feeds the article appears once, ranked as the lower id
+        assert [(a.url, a.priority) for a in db.query([1, 3], since)[0]] == [(shared.url, 1), (only_one.url, 1)]
+        assert [a.url for a in db.query([3], since, "vang")[0]] == [shared.url]
+        assert not db.query([1, 3], since)[1]
+        
+        # A window past the row cap says so, and its cursor pages keep saying so
+        cap = news._DB_MAX_ROWS
+        news._DB_MAX_ROWS = 1
+        try:
+            rows, truncated = db.query([1, 3], since)
+        finally:
+            news._DB_MAX_ROWS = cap
+        assert [a.url for a in rows] == [shared.url] and truncated
+        page = news._snapshot_page(None, rows * 3, now, "all", 0, 1, now, truncated=truncated)
+        assert page["truncated"]
+        assert news.fetch_latest_news(max_results=1, cursor=page["next_cursor"])["truncated"]
+        
+        articles, _ = db.latest_per_feed(1, 10)
+        assert [a.url for a in articles] == [shared.url, only_one.url]
+        articles, _ = db.latest_per_feed(3, 10)
+        assert [(a.url, a.priority) for a in articles] == [(shared.url, 3)]
+        print(f"Database: {db.stats()}")
+        
+        old = make_article("Tin cũ", "https://a.vn/old", "VnExpress", "", "", now.timestamp() - 90 * 86400, 2)
+        db.upsert([old])
+        assert db.prune() == 1
+        assert db.latest_per_feed(2, 10) == ([], None)
+
+def test_host_slots():
+    """A feed whose host has no free request slot is skipped once its timeout runs out"""
+    import asyncio
+    import time
+    url = "http://busy.invalid/rss"
+    slot = news._host_slot(url)
+    for _ in range(news._POOL_PER_HOST):
+        assert slot.acquire(blocking=False)
+    try:
+        start = time.monotonic()
+        assert news.fetch_rss_feed("Busy", url, timeout=0.2) == []
+        assert time.monotonic() - start < 1
+    finally:
+        for _ in range(news._POOL_PER_HOST):
+            slot.release()
+    
+    async def async_check():
+        news._get_async_client()
+        async_slot = news._async_host_slot(url)
+        for _ in range(news._POOL_PER_HOST):
+            await async_slot.acquire()
+        try:
+            return await news.fetch_rss_feed_async("Busy", url, timeout=0.2)
+        finally:
+            for _ in range(news._POOL_PER_HOST):
+                async_slot.release()
+            await news.close_async_client()
+    assert asyncio.run(async_check()) == []
+    
+    # Waiting for a slot is not a failure of the feed
+    breaker = news._get_breaker(url)
+    print(f"Busy host breaker: {breaker.stats()}")
+    assert breaker.healthy and breaker.stats()["failures"] == 0 and breaker.allow()
+    breaker.release()
+
+def _rss(items, tail="</channel></rss>"):
+    """RSS document from (title, url, published_ts, description) tuples"""
+    from email.utils import formatdate
+    body = "".join(f"<item><title>{title}</title><link>{url}</link><pubDate>{formatdate(ts)}</pubDate>"
+                   f"<description>{description}</description></item>"
+                   for title, url, ts, description in items)
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{body}{tail}'.encode()
+
+def test_stream_parse():
+    """High-water stop rule, merge with earlier parses, feedparser fallback and HTML cleaning"""
+    t0 = 1_700_000_000.0
+    first = _rss([("Tin A", "https://a.vn/a", t0, ""), ("Tin B", "https://a.vn/b", t0 - 100, "")])
+    previous = news._parse_new_articles(first, "VnExpress", 10, 1, None)
+    assert [a.title for a in previous] == ["Tin A", "Tin B"]
+    
+    # A new entry published in the same second as the newest known one is kept,
+    # and the known entry parsed again is not duplicated
+    second = _rss([("Tin C", "https://a.vn/c", t0, ""), ("Tin A", "https://a.vn/a", t0, ""),
+                   ("Tin B", "https://a.vn/b", t0 - 100, "")])
+    merged = news._parse_new_articles(second, "VnExpress", 10, 1, previous)
+    print(f"Merged: {[a.title for a in merged]}")
+    assert [a.title for a in merged] == ["Tin C", "Tin A", "Tin B"]
+    
+    # Parsing stops at the first older entry: the broken tail is never read
+    broken = _rss([("Tin C", "https://a.vn/c", t0, ""), ("Tin B", "https://a.vn/b", t0 - 100, ""),
+                   ("Tin D", "https://a.vn/d", t0 + 50, "")], tail="<item><<<")
+    chunks = [broken[i:i + 64] for i in range(0, len(broken), 64)]
+    articles, stopped_early = news._stream_parse_feed(iter(chunks), "VnExpress", 10, t0, 1)
+    assert [a.title for a in articles] == ["Tin C"] and stopped_early
+    articles, stopped_early = news._stream_parse_feed(iter(chunks), "VnExpress", 1, None, 1)
+    assert [a.title for a in articles] == ["Tin C"] and stopped_early
+    
+    # A bare '&' is not well-formed XML; feedparser still reads the feed
+    loose = _rss([("Tom & Jerry", "https://a.vn/t", t0, "Phim hoạt hình")])
+    try:
+        news._stream_parse_feed(iter([loose]), "VnExpress", 10, None, 1)
+        assert False, "malformed feed parsed as XML"
+    except news.ET.ParseError:
+        pass
+    articles = news._parse_new_articles(loose, "VnExpress", 10, 1, None)
+    assert [(a.title, a.url) for a in articles] == [("Tom & Jerry", "https://a.vn/t")]
+    
+    # Tags and entities go in one pass: decoded text is never re-parsed
+    assert news._clean_html("<p>Giá &amp; <b>vàng</b> &#273;&#x1EA1;t</p>") == "Giá & vàng đạt"
+    assert news._clean_html("&lt;b&gt;đậm&lt;/b&gt;") == "<b>đậm</b>"
+    assert news._clean_html("&amp;lt;") == "&lt;"
+    assert news._clean_html("<i>abcdef</i>", 3) == "abc"
+    # Descriptions carry escaped HTML: the XML parser unescapes it, then tags are stripped
+    escaped = _rss([("Giá &amp; vàng", "https://a.vn/g", t0, "&lt;p&gt;Tăng &lt;b&gt;mạnh&lt;/b&gt; &amp;amp;&lt;/p&gt;")])
+    article = news._parse_new_articles(escaped, "VnExpress", 10, 1, None)[0]
+    assert (article.title, article.excerpt) == ("Giá & vàng", "Tăng mạnh &")
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Testing news service structures (offline)")
+    print("="*60)
+    test_keyword_index()
+    test_dedup_clusters()
+    test_cursor_pages()
+    test_circuit_breaker()
+    test_article_db_feeds()
+    test_host_slots()
+    test_stream_parse()
+    print("="*60)
+    print("All tests completed!")
+    print("="*60)
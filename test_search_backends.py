@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Offline test and benchmark for hedged search backends
+Uses LocalBackend stubs, so no network access is needed
+"""
+
+import time
+import logging
+from google_search import (DDGSClientPool, HedgedSearch, LocalBackend, SearchBackend,
+                           TimeoutException, DDGSException, RatelimitException)
+
+# Only show warnings from the search service
+logging.getLogger('GoogleSearch').setLevel(logging.WARNING)
+
+def run_benchmark(backends, requests: int = 400, warmup: int = 50) -> dict:
+    """Latency percentiles (ms) of hedged searches over the given backends"""
+    hedged = HedgedSearch(backends)
+    latencies = []
+    for idx in range(requests):
+        started = time.perf_counter()
+        hedged.search("benchmark", "vn-vi", 3, timeout=5)
+        if idx >= warmup:
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+        "over_500ms": sum(1 for latency in latencies if latency > 0.5),
+        "backends": hedged.stats(),
+    }
+
+def test_hedging_cuts_tail_latency():
+    """2% of calls take 1s; a hedged second backend should hide most of them"""
+    single = run_benchmark([LocalBackend("primary", 0.005, slow_latency=1.0, slow_rate=0.02, seed=1)])
+    hedged = run_benchmark([LocalBackend("primary", 0.005, slow_latency=1.0, slow_rate=0.02, seed=1),
+                            LocalBackend("secondary", 0.01, slow_latency=1.0, slow_rate=0.02, seed=2)])
+    print(f"Single backend: p50 {single['p50_ms']} ms, p99 {single['p99_ms']} ms, {single['over_500ms']} over 500 ms")
+    print(f"Hedged:         p50 {hedged['p50_ms']} ms, p99 {hedged['p99_ms']} ms, {hedged['over_500ms']} over 500 ms")
+    print(f"Backend stats:  {hedged['backends']}")
+    assert hedged["backends"]["secondary"]["hedges"] > 0
+    assert hedged["over_500ms"] < single["over_500ms"]
+
+def test_failed_backend_falls_back():
+    """A failing backend hands over to the next one immediately"""
+    hedged = HedgedSearch([LocalBackend("broken", 0.01, error_rate=1.0), LocalBackend("working", 0.01)])
+    results, backend = hedged.search("fallback", "vn-vi", 2, timeout=2)
+    print(f"Answered by {backend}: {[result['title'] for result in results]}")
+    assert backend == "working" and len(results) == 2
+    assert hedged.stats()["broken"]["error_rate"] == 1.0
+
+def test_timeout_and_errors():
+    """A slow backend times out; when every backend fails the last error is raised"""
+    try:
+        HedgedSearch([LocalBackend("slow", 1.0)]).search("timeout", "vn-vi", 2, timeout=0.2)
+        assert False, "expected a timeout"
+    except TimeoutException as e:
+        print(f"Timed out as expected: {e}")
+    try:
+        HedgedSearch([LocalBackend("broken", 0.01, error_rate=1.0)]).search("error", "vn-vi", 2, timeout=1)
+        assert False, "expected an error"
+    except DDGSException as e:
+        print(f"Failed as expected: {e}")
+
+def test_incomplete_backend_rejected():
+    """A backend without search() fails when it is built, not mid-search"""
+    class Incomplete(SearchBackend):
+        name = "incomplete"
+    try:
+        Incomplete()
+        assert False, "incomplete backend was constructed"
+    except TypeError as e:
+        print(f"Rejected as expected: {e}")
+
+def test_client_pool_keeps_client_without_hits():
+    """A search without hits returns its client; transport errors and throttling retire it"""
+    pool = DDGSClientPool(size=1)
+    pool._new_client = object
+    for error in (DDGSException("No results found."), DDGSException("ConnectError: connection reset"),
+                  RatelimitException("202 Ratelimit"), TimeoutException("timed out")):
+        try:
+            with pool.client():
+                raise error
+        except DDGSException:
+            pass
+    stats = pool.stats()
+    print(f"Client pool: {stats}")
+    assert stats["kept_after_error"] == 1 and stats["discarded"] == 3 and stats["created"] == 3
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Testing hedged search backends (offline)")
+    print("="*60)
+    test_failed_backend_falls_back()
+    test_timeout_and_errors()
+    test_incomplete_backend_rejected()
+    test_client_pool_keeps_client_without_hits()
+    test_hedging_cuts_tail_latency()
+    print("="*60)
+    print("All tests completed!")
+    print("="*60)
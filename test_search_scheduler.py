@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Offline test for the search request scheduler
+Drives SearchScheduler directly, so no network access is needed
+"""
+
+import time
+import random
+import logging
+import threading
+from google_search import SearchScheduler, SearchBudgetExceeded, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+
+# Only show warnings from the search service
+logging.getLogger('GoogleSearch').setLevel(logging.WARNING)
+
+def test_priority_order():
+    """Queued interactive searches are served before batch searches that arrived earlier"""
+    scheduler = SearchScheduler(rate_per_minute=300, burst=1)  # One token every 0.2s
+    scheduler.acquire(PRIORITY_BATCH, time.monotonic() + 1)
+    order = []
+    
+    def search(name: str, priority: int):
+        scheduler.acquire(priority, time.monotonic() + 5)
+        order.append(name)
+    
+    threads = []
+    for name, priority in (("batch-1", PRIORITY_BATCH), ("batch-2", PRIORITY_BATCH), ("interactive", PRIORITY_INTERACTIVE)):
+        thread = threading.Thread(target=search, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    print(f"Served in order: {order}")
+    assert order == ["interactive", "batch-1", "batch-2"]
+    assert scheduler.stats()["granted"] == 4
+
+def test_budget_rejected_early():
+    """A search whose expected wait passes its deadline fails at once instead of sleeping"""
+    scheduler = SearchScheduler(rate_per_minute=6, burst=1)  # One token every 10s
+    scheduler.acquire(PRIORITY_INTERACTIVE, time.monotonic() + 1)
+    started = time.monotonic()
+    try:
+        scheduler.acquire(PRIORITY_INTERACTIVE, started + 2)
+        assert False, "expected SearchBudgetExceeded"
+    except SearchBudgetExceeded as e:
+        print(f"Rejected as expected: {e}")
+    assert time.monotonic() - started < 0.1
+    stats = scheduler.stats()
+    assert stats["rejected"] == 1 and stats["waiting"] == 0
+
+def test_throttle_backoff():
+    """Throttling pauses the bucket for a jittered, capped backoff; success resets it"""
+    random.seed(7)
+    scheduler = SearchScheduler(rate_per_minute=600, burst=4, backoff_base=0.2, backoff_cap=1.0)
+    pauses = [scheduler.record_throttle() for _ in range(6)]
+    print(f"Backoff pauses: {[round(pause, 2) for pause in pauses]}")
+    previous = 0.2
+    for pause in pauses:
+        assert 0.2 <= pause <= min(1.0, previous * 3)
+        previous = pause
+    # Repeated throttling backs off past the first pause's range
+    assert max(pauses) > 0.6
+    
+    # Paused: optional requests are refused and short budgets fail fast
+    assert scheduler.stats()["paused_seconds"] > 0.5
+    assert not scheduler.try_acquire()
+    try:
+        scheduler.acquire(PRIORITY_INTERACTIVE, time.monotonic() + 0.3)
+        assert False, "expected SearchBudgetExceeded during the pause"
+    except SearchBudgetExceeded:
+        pass
+    # The pause ends with a single probe token
+    waited = scheduler.acquire(PRIORITY_INTERACTIVE, time.monotonic() + 2)
+    assert 0.5 < waited <= 1.1
+    assert scheduler.stats()["tokens"] < 1
+    
+    scheduler.record_success()
+    assert scheduler.record_throttle() <= 0.6
+
+def test_try_acquire():
+    """try_acquire takes a free token, but never one a queued search is waiting for"""
+    scheduler = SearchScheduler(rate_per_minute=60, burst=2)  # One token a second
+    assert scheduler.try_acquire()
+    assert scheduler.try_acquire()
+    assert not scheduler.try_acquire()
+    
+    time.sleep(1.05)
+    waiter = threading.Thread(target=scheduler.acquire, args=(PRIORITY_BATCH, time.monotonic() + 5))
+    scheduler.acquire(PRIORITY_INTERACTIVE, time.monotonic() + 1)
+    waiter.start()
+    time.sleep(0.1)
+    assert scheduler.stats()["waiting"] == 1
+    assert not scheduler.try_acquire()
+    waiter.join()
+    print(f"Scheduler stats: {scheduler.stats()}")
+    assert scheduler.stats()["granted"] == 4
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Testing search scheduler (offline)")
+    print("="*60)
+    test_priority_order()
+    test_budget_rejected_early()
+    test_throttle_backoff()
+    test_try_acquire()
+    print("="*60)
+    print("All tests completed!")
+    print("="*60)